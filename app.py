@@ -3,6 +3,7 @@ import os
 import base64
 from main import run_full_process
 import src.config as config
+from pdf_converter.model_manager import get_model_manager, warmup_modes
 
 # --- 全局设置 ---
 OUTPUT_DIR = "web_output"
@@ -226,4 +227,7 @@ with gr.Blocks(title="PDF处理工具", theme=gr.themes.Soft()) as demo:
     )
 
 if __name__ == "__main__":
+    # 在后台预先加载PDF分析模型，第一个文档无需等待模型初始化
+    if config.PDF_MODEL_WARMUP:
+        get_model_manager().warm_up_async(warmup_modes(config.PDF_MODEL_WARMUP))
     demo.launch(inbrowser=True) 
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+占位符保护与还原的性能基准
+
+构造一篇包含一万个数学公式的合成文档，对比逐个占位符调用str.replace的旧实现
+与单次扫描的PlaceholderEngine。
+
+用法: python benchmarks/bench_placeholders.py [--formulas 10000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from translation.placeholders import PlaceholderEngine
+
+
+def build_document(formula_count):
+    """生成合成文档：每段含若干行内公式，每隔一段插入块级公式、代码块或表格"""
+    paragraphs = []
+    for i in range(0, formula_count, 4):
+        paragraphs.append(
+            f"Paragraph {i} cites $x_{{{i}}}^2$, $\\alpha_{{{i}}}$ and $\\sum_j y_j$ in the text."
+        )
+        paragraphs.append(f"$$\\int_0^{{{i}}} f(t)\\,dt$$")
+        if i % 40 == 0:
+            paragraphs.append("```python\nprint('$not math$')\n```")
+            paragraphs.append("<html><body><table><tr><td>cell</td></tr></table></body></html>")
+    return '\n\n'.join(paragraphs)
+
+
+def legacy_protect_restore(text):
+    """旧实现：公式、代码块、表格分别扫描，还原时每个占位符对全文调用一次replace"""
+    placeholders = {}
+    counter = 0
+
+    def replace_block(match):
+        nonlocal counter
+        key = f"__MATH_BLOCK_{counter}__"
+        placeholders[key] = f'<div class="math-block">$${match.group(1)}$$</div>'
+        counter += 1
+        return key
+
+    def replace_inline(match):
+        nonlocal counter
+        key = f"__MATH_INLINE_{counter}__"
+        placeholders[key] = f'<span class="math-inline">${match.group(1)}$</span>'
+        counter += 1
+        return key
+
+    text = re.sub(r'\$\$([^\$]+?)\$\$', replace_block, text)
+    text = re.sub(r'\$([^\$]+?)\$', replace_inline, text)
+
+    tables = re.findall(r'<html>.*?</table>', text, re.DOTALL)
+    for i, table in enumerate(tables):
+        key = f"HTML_TABLE_PLACEHOLDER_{i}__"
+        text = text.replace(table, key, 1)
+        placeholders[key] = table
+
+    for key, value in placeholders.items():
+        text = text.replace(key, value)
+    return text
+
+
+def engine_protect_restore(text):
+    """新实现：一次扫描保护，一次扫描还原"""
+    engine = PlaceholderEngine()
+    protected, placeholders = engine.protect(text)
+    return engine.restore(protected, placeholders)
+
+
+def measure(func, text, repeat):
+    """返回多次运行中的最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="占位符保护与还原的性能基准")
+    parser.add_argument("--formulas", type=int, default=10000, help="合成文档中的公式数量，默认为10000")
+    parser.add_argument("--repeat", type=int, default=3, help="每种实现的运行次数，取最短耗时")
+    args = parser.parse_args()
+
+    text = build_document(args.formulas)
+    print(f"合成文档: {len(text)} 个字符, 约 {args.formulas} 个公式")
+
+    legacy = measure(legacy_protect_restore, text, args.repeat)
+    engine = measure(engine_protect_restore, text, args.repeat)
+    print(f"逐个replace: {legacy * 1000:.1f} ms")
+    print(f"PlaceholderEngine: {engine * 1000:.1f} ms")
+    print(f"加速比: {legacy / engine:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 import config
 from pdf_to_markdown import to_markdown
-from translate_markdown import process_translation
+from pdf_converter.conversion_cache import get_conversion_cache
+from translate_markdown import process_translation, plan_translation
+from translation.planner import format_plan
 from markdown_to_pdf import process_markdown_to_pdf
 
 def update_config_file(app_id, app_key):
@@ -29,7 +31,8 @@ def update_config_file(app_id, app_key):
 def run_full_process(pdf_file, output_dir="output", skip_translation=False, keep_intermediate=False, 
                      from_lang='auto', to_lang='zh', baidu_app_id=None, baidu_app_key=None,
                      page_size='A4', orientation='Portrait', margin_top='15mm', 
-                     margin_right='15mm', margin_bottom='15mm', margin_left='15mm'):
+                     margin_right='15mm', margin_bottom='15mm', margin_left='15mm', use_cache=True,
+                     dry_run=False, pdf_engine=None):
     """
     执行完整的PDF到PDF处理流程。
     这是一个生成器函数，会逐步yield日志信息。
@@ -48,6 +51,9 @@ def run_full_process(pdf_file, output_dir="output", skip_translation=False, keep
     :param margin_right: PDF右边距
     :param margin_bottom: PDF下边距
     :param margin_left: PDF左边距
+    :param use_cache: 是否启用翻译缓存
+    :param dry_run: 是否只预演翻译，在PDF转换完成后统计请求数和预计耗时，不调用翻译服务，也不生成PDF
+    :param pdf_engine: PDF解析引擎 (auto、mineru 或 fast)，为None时使用配置中的PDF_ENGINE
     :yield: (str) 日志信息
     :return: (str) 最终生成的PDF路径
     """
@@ -56,7 +62,9 @@ def run_full_process(pdf_file, output_dir="output", skip_translation=False, keep
     
     # --- 步骤 1: PDF to Markdown ---
     yield "\n--- 步骤 1: 将PDF转换为Markdown ---"
-    md_result = to_markdown(pdf_file, output_dir)
+    conversion_cache = get_conversion_cache(config.PDF_CACHE_DIR, config.PDF_CACHE_MAX_BYTES) if config.PDF_CACHE_ENABLED else None
+    md_result = to_markdown(pdf_file, output_dir, config.PDF_SHARD_PAGES, config.PDF_SHARD_WORKERS, conversion_cache,
+                            hybrid_ocr=config.PDF_HYBRID_OCR, engine=pdf_engine or config.PDF_ENGINE)
     if md_result["status"] != "success":
         yield f"PDF到Markdown转换失败: {md_result.get('message', '未知错误')}"
         return
@@ -66,6 +74,17 @@ def run_full_process(pdf_file, output_dir="output", skip_translation=False, keep
     
     # --- 步骤 2: 翻译Markdown (可选) ---
     final_md_path = md_path
+    if dry_run:
+        yield "\n--- 步骤 2: 翻译预演 ---"
+        translated_md_path = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(md_path))[0]}_translated.md")
+        plan, error = plan_translation(md_path, translated_md_path, from_lang=from_lang, to_lang=to_lang,
+                                       app_id=baidu_app_id, app_key=baidu_app_key)
+        if error:
+            yield f"翻译预演失败: {error}"
+        else:
+            yield format_plan(plan)
+        return
+    
     if not skip_translation:
         yield "\n--- 步骤 2: 翻译Markdown文件 ---"
         
@@ -99,7 +118,8 @@ def run_full_process(pdf_file, output_dir="output", skip_translation=False, keep
             from_lang=from_lang, 
             to_lang=to_lang, 
             app_id=app_id, 
-            app_key=app_key
+            app_key=app_key,
+            use_cache=use_cache
         )
         
         if error:
@@ -164,6 +184,10 @@ def main():
     parser.add_argument('--margin-right', default='15mm', help='右边距 (例如: 10mm)。 默认: 15mm')
     parser.add_argument('--margin-bottom', default='15mm', help='下边距 (例如: 10mm)。 默认: 15mm')
     parser.add_argument('--margin-left', default='15mm', help='左边距 (例如: 10mm)。 默认: 15mm')
+    parser.add_argument("--no-cache", action="store_true", help="如果设置，将不使用翻译缓存")
+    parser.add_argument("--dry-run", action="store_true", help="如果设置，PDF转换后只预演翻译，输出请求数和预计耗时，不调用翻译服务")
+    parser.add_argument("--pdf-engine", choices=["auto", "mineru", "fast"], default=None,
+                        help=f"PDF解析引擎：auto 自动选择，mineru 使用MinerU模型，fast 直接用PyMuPDF提取文本层 (默认为: {config.PDF_ENGINE})")
 
     args = parser.parse_args()
     
@@ -185,7 +209,10 @@ def main():
         margin_top=args.margin_top,
         margin_right=args.margin_right,
         margin_bottom=args.margin_bottom,
-        margin_left=args.margin_left
+        margin_left=args.margin_left,
+        use_cache=not args.no_cache,
+        dry_run=args.dry_run,
+        pdf_engine=args.pdf_engine
     ):
         print(log_message)
 
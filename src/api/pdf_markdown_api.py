@@ -3,7 +3,16 @@ import sys
 import json
 from flask import Flask, request, jsonify, send_file
 from werkzeug.utils import secure_filename
+
+# 将pdf_converter目录和src目录添加到系统路径中，以便导入模块
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(SRC_DIR, 'pdf_converter'))
+sys.path.append(SRC_DIR)
+
+import config
 from pdf_to_markdown import pdf_to_markdown
+from pdf_converter.model_manager import get_model_manager, warmup_modes
+from pdf_converter.conversion_cache import get_conversion_cache
 
 app = Flask(__name__)
 
@@ -20,6 +29,12 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['OUTPUT_FOLDER'] = OUTPUT_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 限制上传大小为16MB
 
+def conversion_cache():
+    """获取转换结果缓存，未启用时返回None"""
+    if not config.PDF_CACHE_ENABLED:
+        return None
+    return get_conversion_cache(config.PDF_CACHE_DIR, config.PDF_CACHE_MAX_BYTES)
+
 def allowed_file(filename):
     """检查文件类型是否允许"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -77,7 +92,9 @@ def convert_pdf():
         output_dir = os.path.join(app.config['OUTPUT_FOLDER'], name_without_ext)
         
         # 转换PDF到Markdown
-        result = pdf_to_markdown(file_path, output_dir)
+        result = pdf_to_markdown(file_path, output_dir, config.PDF_SHARD_PAGES, config.PDF_SHARD_WORKERS,
+                                 conversion_cache(), hybrid_ocr=config.PDF_HYBRID_OCR,
+                                 engine=config.PDF_ENGINE)
         
         if result['status'] == 'success':
             # 返回成功响应和下载链接
@@ -133,7 +150,9 @@ def api_convert():
         output_dir = os.path.join(app.config['OUTPUT_FOLDER'], name_without_ext)
         
         # 转换PDF到Markdown
-        result = pdf_to_markdown(file_path, output_dir)
+        result = pdf_to_markdown(file_path, output_dir, config.PDF_SHARD_PAGES, config.PDF_SHARD_WORKERS,
+                                 conversion_cache(), hybrid_ocr=config.PDF_HYBRID_OCR,
+                                 engine=config.PDF_ENGINE)
         
         # 返回处理结果
         return jsonify(result)
@@ -141,10 +160,28 @@ def api_convert():
     except Exception as e:
         return jsonify({'status': 'error', 'message': f'服务器错误: {str(e)}'}), 500
 
+@app.route('/api/models', methods=['GET'])
+def api_models():
+    """查看当前工作进程中分析模型的加载情况（加载耗时、内存占用）"""
+    return jsonify(get_model_manager().stats())
+
+@app.route('/api/cache', methods=['GET'])
+def api_cache():
+    """查看转换结果缓存的命中情况和占用空间"""
+    cache = conversion_cache()
+    if cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(cache.stats(), enabled=True))
+
 if __name__ == '__main__':
     # 获取端口参数，默认为5000
     port = int(os.environ.get('PORT', 5000))
     
+    # 在后台预先加载分析模型，第一个请求无需等待模型初始化
+    # 调试模式下由重载器启动的子进程负责处理请求，只在子进程中预热
+    if config.PDF_MODEL_WARMUP and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        get_model_manager().warm_up_async(warmup_modes(config.PDF_MODEL_WARMUP))
+    
     # 启动服务
     print(f"PDF转Markdown服务已启动，访问 http://localhost:{port}/ 使用")
     app.run(host='0.0.0.0', port=port, debug=True) 
\ No newline at end of file
@@ -2,14 +2,53 @@
 配置文件
 """
 
+import os
+
 # 百度翻译API配置
 BAIDU_TRANSLATE_APP_ID = ""  # 请填入您的百度翻译APP ID
 BAIDU_TRANSLATE_APP_KEY = ""  # 请填入您的百度翻译密钥
+# 额外的百度翻译密钥，格式为 [("APP ID", "密钥"), ...]，与上面的密钥一起组成密钥池以叠加QPS和字符额度
+BAIDU_TRANSLATE_EXTRA_KEYS = []
+BAIDU_KEY_POOL_STRATEGY = "round_robin"  # 密钥池分发策略: round_robin(轮询) 或 least_loaded(最小负载)
+BAIDU_ACCOUNT_TIER = "standard"  # 账户等级，决定QPS配额: standard(1), advanced(10), premium(100)
 
 # 默认语言配置
 SOURCE_LANG = "en"  # 源语言
 TARGET_LANG = "zh"  # 目标语言 
 
+# 翻译请求的网络配置
+TRANSLATION_POOL_SIZE = 10  # 连接池大小
+TRANSLATION_CONNECT_TIMEOUT = 5  # 建立连接的超时时间（秒）
+TRANSLATION_READ_TIMEOUT = 30  # 等待响应的超时时间（秒）
+TRANSLATION_MAX_RETRIES = 3  # 临时错误（网络、5xx、限流）的最大重试次数
+TRANSLATION_CIRCUIT_FAILURE_THRESHOLD = 5  # 连续失败多少次后熔断
+TRANSLATION_CIRCUIT_RECOVERY_TIMEOUT = 30  # 熔断后多少秒再尝试恢复
+TRANSLATION_MAX_WORKERS = 4  # 并行翻译的线程数，设为1时逐组顺序翻译
+TRANSLATION_FILE_WORKERS = 4  # 批量翻译时同时翻译的文件数
+TRANSLATION_STREAMING_THRESHOLD = 1024 * 1024  # 超过该大小（字节）的Markdown文件使用流式翻译
+TRANSLATION_STREAMING_WINDOW_CHARS = 20000  # 流式翻译时每次读取、翻译并写入的字符数
+TRANSLATION_JOURNAL_CHECKPOINT_CHARS = 12000  # 断点日志每完成多少字符的翻译写入一次
+
+# 术语表配置
+# JSON文件 {"术语": "译名"}（译名为null时保留原文），或每行"术语<TAB>译名"的文本文件；为None时不使用术语表
+TRANSLATION_GLOSSARY_PATH = None
+TRANSLATION_GLOSSARY_CASE_SENSITIVE = True  # 术语匹配是否区分大小写
+
+# PDF解析配置
+PDF_MODEL_WARMUP = "text"  # Web服务启动时在后台预先加载哪组分析模型：False（不预热）、"text"、"ocr"、"all"；每组模型各占一份内存
+PDF_SHARD_PAGES = 50  # 页数超过该值的PDF按页范围分片，在多个进程中并行解析
+PDF_SHARD_WORKERS = 2  # 并行解析分片的进程数，每个进程各自加载一份模型；为1时不分片
+PDF_ENGINE = "auto"  # PDF解析引擎：auto（简单的纯文本PDF用PyMuPDF快速提取，其余用MinerU）、mineru、fast
+PDF_HYBRID_OCR = True  # 是否按页选择解析模式，只对没有可用文本层的扫描页使用OCR
+PDF_CACHE_ENABLED = True  # 是否缓存PDF转换结果，重复上传同一份PDF时直接复用
+PDF_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "pdf_conversions")  # 转换结果缓存目录
+PDF_CACHE_MAX_BYTES = 2 * 1024 ** 3  # 转换结果缓存的总大小上限（字节），超出后淘汰最久未使用的条目
+
+# 翻译缓存配置
+TRANSLATION_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "translation_cache.db")  # 缓存数据库路径
+TRANSLATION_CACHE_MAX_ENTRIES = 200000  # 最多缓存的片段数，超出后淘汰最久未使用的条目
+TRANSLATION_CACHE_TTL_DAYS = 90  # 缓存有效期（天），设为None表示永不过期
+
 # 百度翻译支持的语言列表 (代码 -> 名称)
 # 完整列表请参考百度翻译官方文档
 SUPPORTED_LANGUAGES = {
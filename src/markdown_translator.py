@@ -1,29 +1,219 @@
+import io
 import re
-from typing import List, Tuple, Dict, Any
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Any, Iterable, Iterator, Optional
 from translation_api import TranslationAPI
+from translation.manifest import TranslationManifest
+from translation.skip_rules import SegmentClassifier
+from translation.placeholders import PlaceholderEngine, PLACEHOLDER_PATTERN, TABLE_PLACEHOLDER_PATTERN
+from translation.html_tables import split_table_cells
+from translation.glossary import Glossary
+
+
+# 不能与相邻行合并的结构行：标题、列表项、引用、表格、HTML、代码围栏、图片、分隔线、setext标题下划线、独占一行的占位符
+_STRUCTURAL_LINE_RE = re.compile(
+    r'^\s*(?:#{1,6}(?:\s|$)|[-*+]\s|\d+[.)]\s|>|\||<|```|!\[|(?:[-*_]\s*){3,}$|=+\s*$'
+    r'|(?:__[A-Z_]+_\d+__|HTML_TABLE_PLACEHOLDER_\d+__)\s*$)'
+)
+# 行内特殊元素的词法分析器，按优先级排列，通过命名分组区分元素类型
+_INLINE_LEXER = re.compile(r'''
+    (?P<code>`[^`]+`)                                                   # 行内代码
+  | (?P<link>\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)]+)\))          # 链接 - 只翻译显示文本
+  | (?P<image>!\[(?P<image_alt>[^\]]*)\]\((?P<image_url>[^)]+)\))       # 图片 - 只翻译alt文本
+  | (?P<bold>\*\*(?P<bold_text>[^*]+)\*\*)                                # 粗体
+  | (?P<italic>\*(?P<italic_text>[^*]+)\*)                                # 斜体
+  | (?P<strike>~~(?P<strike_text>[^~]+)~~)                               # 删除线
+  | (?P<placeholder>__(?:MATH_[A-Z]+|CODE_BLOCK|GLOSSARY)_\d+__|HTML_TABLE_PLACEHOLDER_\d+__)  # 占位符
+''', re.VERBOSE)
+# 不能交给翻译的行内元素（代码、链接、图片、占位符），用于判断强调或链接文本内部是否需要递归分割
+_PROTECTED_INLINE_RE = re.compile(
+    r'`[^`]+`|!?\[[^\]]*\]\([^)]+\)|__(?:MATH_[A-Z]+|CODE_BLOCK|GLOSSARY)_\d+__|HTML_TABLE_PLACEHOLDER_\d+__'
+)
+# 术语表占位符，用于把单元格文本中的术语拆分出来
+_GLOSSARY_SPLIT_RE = re.compile(r'(__GLOSSARY_\d+__)')
+# 强调类元素的类型与标记
+_EMPHASIS_MARKERS = {'bold': '**', 'italic': '*', 'strike': '~~'}
+# 行尾的硬换行标记：反斜杠或<br>；MinerU会在行尾输出两个空格，行尾空格不作为硬换行
+_HARD_BREAK_RE = re.compile(r'(?:\\|<br\s*/?>)\s*$', re.IGNORECASE)
+# 中日韩文字，这些文字之间换行合并时不需要补空格
+_CJK_CHAR_RE = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    将Markdown文本流按空行切分为块，代码块、块级公式和HTML表格内部的空行不作为分界
+    :param lines: 保留行尾换行符的文本行，例如打开的文件对象
+    :return: 依次产出的文本块，拼接起来与原文完全一致
+    """
+    block = []
+    in_fence = False
+    in_display_math = False
+    in_table = False
+    previous_blank = False
+    
+    for line in lines:
+        blank = not line.strip()
+        # 空行之后出现新的内容，且不在任何未闭合的结构中，则开始新的块
+        if block and previous_blank and not blank and not (in_fence or in_display_math or in_table):
+            yield ''.join(block)
+            block = []
+        block.append(line)
+        previous_blank = blank
+        if blank:
+            continue
+        
+        if line.lstrip(' \t').startswith('```'):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        if line.count('$$') % 2:
+            in_display_math = not in_display_math
+        if '<html>' in line:
+            in_table = '</table>' not in line[line.index('<html>'):]
+        elif in_table and '</table>' in line:
+            in_table = False
+    
+    if block:
+        yield ''.join(block)
+
+
+def iter_markdown_windows(lines: Iterable[str], window_chars: int) -> Iterator[str]:
+    """
+    将若干相邻的块合并为不小于window_chars个字符的窗口，减少分批翻译的次数
+    :param lines: 保留行尾换行符的文本行
+    :param window_chars: 每个窗口的目标字符数
+    :return: 依次产出的窗口文本
+    """
+    window = []
+    size = 0
+    for block in iter_markdown_blocks(lines):
+        window.append(block)
+        size += len(block)
+        if size >= window_chars:
+            yield ''.join(window)
+            window = []
+            size = 0
+    if window:
+        yield ''.join(window)
+
+
+class Segment:
+    """文档中的一个待翻译片段"""
+    
+    __slots__ = ('index', 'text', 'line', 'position')
+    
+    def __init__(self, index: int, text: str, line: int, position: int):
+        """
+        :param index: 片段在文档中的序号
+        :param text: 片段原文
+        :param line: 片段所在的行号（从0开始，按保护占位符后的文本计）
+        :param position: 片段在文档拼接序列中的位置，表格单元格中的片段为-1
+        """
+        self.index = index
+        self.text = text
+        self.line = line
+        self.position = position
+
+
+class TranslationDocument:
+    """
+    解析后的Markdown文档
+    由不需要翻译的文本和待翻译片段交替组成，翻译完成后按顺序拼接即可还原文档
+    """
+    
+    def __init__(self, placeholders: Dict[str, str]):
+        """
+        :param placeholders: 被保护的代码块、表格和数学公式 {占位符: 还原内容}
+        """
+        self.placeholders = placeholders
+        self.pieces = []  # 按顺序排列的文本(str)和待翻译片段(Segment)
+        self.segments = []  # 所有待翻译片段
+        self.tables = {}  # 需要翻译单元格的表格 {占位符: 按顺序排列的标记(str)和单元格片段(Segment)}
+        self.wrapped = []  # 由多行合并而成的行 [(起始位置, 结束位置, 合并前的各行)]，位置为pieces的下标
+    
+    def add_text(self, text: str) -> None:
+        """追加一段不需要翻译的文本"""
+        if text:
+            self.pieces.append(text)
+    
+    def add_segment(self, text: str, line: int) -> None:
+        """追加一个待翻译片段"""
+        segment = Segment(len(self.segments), text, line, len(self.pieces))
+        self.segments.append(segment)
+        self.pieces.append(segment)
+    
+    def add_table(self, placeholder: str, parts: List[Tuple[str, bool]], line: int) -> None:
+        """
+        登记一个需要翻译单元格的表格，单元格片段与正文片段一起参与去重和批量翻译
+        :param placeholder: 表格的占位符
+        :param parts: (文本, 是否需要翻译) 列表
+        :param line: 表格占位符所在的行号
+        """
+        pieces = []
+        for text, should_translate in parts:
+            if should_translate:
+                segment = Segment(len(self.segments), text, line, -1)
+                self.segments.append(segment)
+                pieces.append(segment)
+            else:
+                pieces.append(text)
+        self.tables[placeholder] = pieces
+    
+    @property
+    def texts(self) -> List[str]:
+        """所有待翻译片段的原文，按文档顺序排列"""
+        return [segment.text for segment in self.segments]
 
 
 class MarkdownTranslator:
     """Markdown文件翻译器"""
     
-    def __init__(self, translator: TranslationAPI, source_lang: str, target_lang: str):
+    def __init__(self, translator: TranslationAPI, source_lang: str, target_lang: str,
+                 reflow_paragraphs: bool = True, max_workers: int = 1, chunk_chars: int = 1800,
+                 protect_tables: bool = True, skip_untranslatable: bool = True, translate_tables: bool = True,
+                 glossary: Optional[Glossary] = None):
         """
         初始化Markdown翻译器
         :param translator: 翻译API接口
         :param source_lang: 源语言
         :param target_lang: 目标语言
+        :param reflow_paragraphs: 是否在翻译前将同一段落中被软换行拆开的多行合并为一行
+        :param max_workers: 并行翻译的线程数，大于1时按块分组后提交到线程池
+        :param chunk_chars: 并行模式下每组片段的目标字符数
+        :param protect_tables: 是否保护HTML表格，使其不被翻译
+        :param skip_untranslatable: 是否在本地识别纯数字、引用、URL、变量名、已是目标语言的文本等片段，不交给翻译API
+        :param translate_tables: 表格受保护时是否翻译其中的单元格文本，标签和属性保持不变
+        :param glossary: 术语表（可选），术语不交给翻译API，按固定译名替换或原样保留
         """
         self.translator = translator
         self.source_lang = source_lang
         self.target_lang = target_lang
+        self.reflow_paragraphs = reflow_paragraphs
+        self.max_workers = max_workers
+        self.chunk_chars = chunk_chars
+        self.placeholder_engine = PlaceholderEngine(protect_tables=protect_tables, glossary=glossary)
+        self.translate_tables = protect_tables and translate_tables
         self.in_code_block = False  # 用于跟踪是否在代码块内
+        self.dedup_stats = {}  # 最近一次翻译的片段去重统计
+        self.classifier = SegmentClassifier(source_lang, target_lang) if skip_untranslatable else None
+        self.skip_stats = {}  # 最近一次翻译的本地跳过统计
     
-    def translate_file(self, input_file: str, output_file: str) -> None:
+    def translate_file(self, input_file: str, output_file: str, streaming: bool = False,
+                       window_chars: int = 20000) -> None:
         """
         翻译整个Markdown文件
         :param input_file: 输入文件路径
         :param output_file: 输出文件路径
+        :param streaming: 是否以流式方式翻译，逐个窗口读取、翻译并写入，内存占用与文件大小无关
+        :param window_chars: 流式翻译时每个窗口的目标字符数
         """
+        if streaming:
+            self.translate_stream(input_file, output_file, window_chars)
+            print(f"翻译完成，已保存到 {output_file}")
+            return
+        
         # 读取原始文件
         with open(input_file, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -37,152 +227,356 @@ class MarkdownTranslator:
         
         print(f"翻译完成，已保存到 {output_file}")
     
-    def translate_markdown(self, markdown_text: str) -> str:
+    def translate_stream(self, input_file: str, output_file: str, window_chars: int = 20000,
+                         manifest: Optional[TranslationManifest] = None) -> None:
+        """
+        流式翻译Markdown文件
+        按空行将文档切分为块并组成窗口，每个窗口翻译完成后立即写入并刷新输出文件，
+        任务进行中即可在磁盘上看到已完成的部分
+        :param input_file: 输入文件路径
+        :param output_file: 输出文件路径
+        :param window_chars: 每个窗口的目标字符数
+        :param manifest: 增量翻译清单（可选），清单中已有的块直接复用译文
+        """
+        with open(input_file, 'r', encoding='utf-8') as src, open(output_file, 'w', encoding='utf-8') as dst:
+            for window in iter_markdown_windows(src, window_chars):
+                dst.write(self.translate_markdown(window, manifest))
+                dst.flush()
+    
+    def translate_markdown(self, markdown_text: str, manifest: Optional[TranslationManifest] = None) -> str:
         """
         翻译Markdown文本，保持原始布局
+        解析、翻译、重组分三步进行，整篇文档的片段一次性交给翻译API
+        :param markdown_text: 原始Markdown文本
+        :param manifest: 增量翻译清单（可选），给出时按块复用已有译文，只翻译新增或修改过的块
+        :return: 翻译后的Markdown文本
+        """
+        if manifest is not None:
+            return self._translate_incremental(markdown_text, manifest)
+        
+        # 第一步：解析文档，收集所有待翻译片段，不发出请求
+        document = self.parse_document(markdown_text)
+        
+        # 第二步：去重、跳过不需要翻译的片段后批量翻译
+        unique = self.skip_untranslatable(self.unique_segments(document))
+        translations = self._translate_unique(document, unique)
+        
+        # 第三步：回填译文，重组文档
+        return self.render_document(document, translations)
+    
+    def _translate_incremental(self, markdown_text: str, manifest: TranslationManifest) -> str:
+        """
+        增量翻译：按空行切分为块，清单中已有的块直接复用译文，
+        其余的块分别解析后合并片段一次性翻译，译文写回清单
         :param markdown_text: 原始Markdown文本
+        :param manifest: 增量翻译清单
         :return: 翻译后的Markdown文本
         """
-        # 预处理：提取并保护数学公式
-        protected_text, math_formulas = self._protect_math_formulas(markdown_text)
+        blocks = list(iter_markdown_blocks(io.StringIO(markdown_text)))
+        outputs = [manifest.get(block) for block in blocks]
+        
+        # 各块单独解析，占位符只在块内有效；合并所有片段后统一去重和翻译
+        documents = {
+            index: self.parse_document(block)
+            for index, (block, output) in enumerate(zip(blocks, outputs)) if output is None
+        }
+        # 各块的行号都从0开始，合并时加上块在原文中的起始行号，使按块分组的并行翻译仍能区分不同的块
+        merged = TranslationDocument({})
+        line_offset = 0
+        for index, block in enumerate(blocks):
+            document = documents.get(index)
+            if document is not None:
+                for segment in document.segments:
+                    segment.line += line_offset
+                merged.segments.extend(document.segments)
+            line_offset += block.count('\n') + 1
+        unique = self.skip_untranslatable(self.unique_segments(merged))
+        translations = self._translate_unique(merged, unique) if unique else {}
+        
+        for index, document in documents.items():
+            outputs[index] = self.render_document(document, translations)
+            manifest.put(blocks[index], outputs[index])
+        
+        return ''.join(outputs)
+    
+    def parse_document(self, markdown_text: str) -> TranslationDocument:
+        """
+        解析Markdown文本，将其拆分为不需要翻译的文本和待翻译片段
+        :param markdown_text: 原始Markdown文本
+        :return: 解析后的文档
+        """
+        # 预处理：一次扫描保护代码块、HTML表格和数学公式
+        protected_text, placeholders = self.placeholder_engine.protect(markdown_text)
         
-        # 预处理：保护代码块
-        protected_text, code_blocks = self._protect_code_blocks(protected_text)
+        document = TranslationDocument(placeholders)
         
-        # 将Markdown文本按行分割
         lines = protected_text.split('\n')
-        translated_lines = []
+        sources = [[line] for line in lines]
+        if self.reflow_paragraphs:
+            lines, sources = self._reflow_paragraphs(lines)
         
         # 逐行处理
-        for line in lines:
+        for line_no, (line, source) in enumerate(zip(lines, sources)):
+            if line_no > 0:
+                document.add_text('\n')
+            start = len(document.pieces)
             # 检查是否为特殊行（图片、分隔符等）
             if self._is_special_line(line):
-                translated_lines.append(line)
+                document.add_text(line)
             else:
-                # 翻译普通文本行，保持原始格式
-                translated_line = self._translate_line(line)
-                translated_lines.append(translated_line)
+                self._parse_line(line, line_no, document)
+            if len(source) > 1:
+                document.wrapped.append((start, len(document.pieces), source))
+            if self.translate_tables and 'HTML_TABLE_PLACEHOLDER_' in line:
+                self._parse_tables(line, line_no, document)
         
-        # 重新组合为完整的Markdown文本
-        translated_text = '\n'.join(translated_lines)
-        
-        # 恢复代码块
-        translated_text = self._restore_code_blocks(translated_text, code_blocks)
-        
-        # 恢复数学公式
-        final_text = self._restore_math_formulas(translated_text, math_formulas)
-        
-        return final_text
+        return document
     
-    def _protect_code_blocks(self, text: str) -> Tuple[str, Dict[str, str]]:
+    def _parse_tables(self, line: str, line_no: int, document: TranslationDocument) -> None:
         """
-        保护代码块，将其替换为占位符
-        :param text: 原始文本
-        :return: (替换后的文本, 代码块字典)
+        拆分行中各个表格的HTML，单元格文本作为待翻译片段加入文档
+        :param line: 含有表格占位符的行
+        :param line_no: 行号
+        :param document: 正在构建的文档
         """
-        lines = text.split('\n')
-        result_lines = []
-        
-        # 存储所有提取的代码块
-        code_blocks = {}
-        current_block = []
-        in_code_block = False
-        block_id = 0
-        
-        for line in lines:
-            # 检测代码块开始或结束
-            if line.strip().startswith("```"):
-                if not in_code_block:  # 开始一个新代码块
-                    in_code_block = True
-                    current_block = [line]  # 包含开始行
-                else:  # 结束当前代码块
-                    current_block.append(line)  # 包含结束行
-                    # 生成占位符并存储代码块
-                    placeholder = f"__CODE_BLOCK_{block_id}__"
-                    code_blocks[placeholder] = '\n'.join(current_block)
-                    result_lines.append(placeholder)
-                    in_code_block = False
-                    block_id += 1
-            else:
-                if in_code_block:
-                    current_block.append(line)
-                else:
-                    result_lines.append(line)
-        
-        # 处理文档末尾未关闭的代码块
-        if in_code_block:
-            placeholder = f"__CODE_BLOCK_{block_id}__"
-            code_blocks[placeholder] = '\n'.join(current_block)
-            result_lines.append(placeholder)
-        
-        return '\n'.join(result_lines), code_blocks
+        for placeholder in TABLE_PLACEHOLDER_PATTERN.findall(line):
+            html = document.placeholders.get(placeholder)
+            if html is not None and placeholder not in document.tables:
+                parts = split_table_cells(html)
+                if self.placeholder_engine.glossary:
+                    parts = self._protect_cell_terms(parts, document.placeholders)
+                document.add_table(placeholder, parts, line_no)
     
-    def _restore_code_blocks(self, text: str, code_blocks: Dict[str, str]) -> str:
+    def _protect_cell_terms(self, parts: List[Tuple[str, bool]],
+                            placeholders: Dict[str, str]) -> List[Tuple[str, bool]]:
         """
-        恢复被保护的代码块
-        :param text: 带有占位符的文本
-        :param code_blocks: 代码块字典
-        :return: 恢复后的文本
+        对单元格文本应用术语表：术语替换为占位符后从单元格文本中拆出，不交给翻译
+        :param parts: split_table_cells返回的 (文本, 是否需要翻译) 列表
+        :param placeholders: 文档的占位符字典，术语的占位符会加入其中
+        :return: 拆分后的 (文本, 是否需要翻译) 列表
         """
-        result = text
-        for placeholder, block in code_blocks.items():
-            result = result.replace(placeholder, block)
+        result = []
+        for text, should_translate in parts:
+            if not should_translate:
+                result.append((text, False))
+                continue
+            protected = self.placeholder_engine.protect_glossary(text, placeholders)
+            for index, chunk in enumerate(_GLOSSARY_SPLIT_RE.split(protected)):
+                if index % 2:
+                    result.append((chunk, False))
+                elif chunk:
+                    result.append((chunk, bool(chunk.strip())))
         return result
     
-    def _protect_math_formulas(self, text: str) -> Tuple[str, Dict[str, str]]:
-        """
-        保护数学公式，将其替换为占位符
-        :param text: 原始文本
-        :return: (替换后的文本, 公式字典)
-        """
-        # 行内数学公式模式: $...$
-        inline_pattern = r'\$([^\$]+?)\$'
-        # 块级数学公式模式: $$...$$
-        block_pattern = r'\$\$([^\$]+?)\$\$'
-        
-        # 存储所有提取的公式
-        formulas = {}
-        placeholder_id = 0
-        
-        # 替换块级公式
-        def replace_block_formula(match):
-            nonlocal placeholder_id
-            placeholder = f"__MATH_BLOCK_{placeholder_id}__"
-            formulas[placeholder] = f"$${match.group(1)}$$"
-            placeholder_id += 1
-            return placeholder
-        
-        # 替换行内公式
-        def replace_inline_formula(match):
-            nonlocal placeholder_id
-            placeholder = f"__MATH_INLINE_{placeholder_id}__"
-            formulas[placeholder] = f"${match.group(1)}$"
-            placeholder_id += 1
-            return placeholder
-        
-        # 先替换块级公式，再替换行内公式
-        protected_text = re.sub(block_pattern, replace_block_formula, text)
-        protected_text = re.sub(inline_pattern, replace_inline_formula, protected_text)
-        
-        return protected_text, formulas
+    def unique_segments(self, document: TranslationDocument) -> List[str]:
+        """
+        对文档中的片段去重，并统计去重节省的请求数和字符数
+        :param document: 解析后的文档
+        :return: 去重后的非空片段，按首次出现的顺序排列
+        """
+        total = [text for text in document.texts if text.strip()]
+        unique = list(dict.fromkeys(total))
+        
+        total_chars = sum(len(text) for text in total)
+        unique_chars = sum(len(text) for text in unique)
+        self.dedup_stats = {
+            "fragments": len(total),
+            "unique": len(unique),
+            "saved_requests": len(total) - len(unique),
+            "saved_chars": total_chars - unique_chars,
+        }
+        if self.dedup_stats["saved_requests"]:
+            print(f"片段去重: 共 {len(total)} 个片段, 去重后 {len(unique)} 个, "
+                  f"节省 {self.dedup_stats['saved_requests']} 次请求, {self.dedup_stats['saved_chars']} 个字符")
+        
+        return unique
+    
+    def skip_untranslatable(self, unique: List[str]) -> List[str]:
+        """
+        在本地过滤掉不需要翻译的片段，这些片段在重组时保留原文
+        :param unique: 去重后的片段
+        :return: 需要交给翻译API的片段
+        """
+        if self.classifier is None:
+            return unique
+        
+        to_translate, skipped = self.classifier.partition(unique)
+        self.skip_stats = self.classifier.stats
+        if skipped:
+            print(f"本地跳过: {len(skipped)} 个片段无需翻译, 节省 {self.skip_stats['saved_requests']} 次请求, "
+                  f"{self.skip_stats['saved_chars']} 个字符, 剩余 {len(to_translate)} 个片段需要翻译")
+        return to_translate
+    
+    def _translate_unique(self, document: TranslationDocument, unique: List[str]) -> Dict[str, str]:
+        """
+        翻译去重后的片段；并行模式下按块分组，各组在线程池中同时翻译
+        :param document: 解析后的文档
+        :param unique: 去重后的片段
+        :return: {原文片段: 译文}
+        """
+        if self.max_workers <= 1 or len(unique) <= 1:
+            translated = self.translator.batch_translate(unique, self.source_lang, self.target_lang)
+            return dict(zip(unique, translated))
+        
+        chunks = self._group_by_block(document, unique)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # map按提交顺序返回结果，与各组的原始顺序一致
+            results = executor.map(
+                lambda chunk: self.translator.batch_translate(chunk, self.source_lang, self.target_lang),
+                chunks
+            )
+            translations = {}
+            for chunk, translated in zip(chunks, results):
+                translations.update(zip(chunk, translated))
+        return translations
+    
+    def _group_by_block(self, document: TranslationDocument, unique: List[str]) -> List[List[str]]:
+        """
+        将片段按所在的块（段落、标题、列表项等，即合并后的一行）分组
+        同一块的片段总在同一组内，每组累计达到chunk_chars后开始新的一组
+        :param document: 解析后的文档
+        :param unique: 去重后的片段
+        :return: 片段分组列表
+        """
+        pending = set(unique)
+        chunks = []
+        current = []
+        size = 0
+        last_line = None
+        for segment in document.segments:
+            if segment.text not in pending:
+                continue
+            pending.discard(segment.text)
+            if segment.line != last_line and size >= self.chunk_chars:
+                chunks.append(current)
+                current = []
+                size = 0
+            current.append(segment.text)
+            size += len(segment.text)
+            last_line = segment.line
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def render_document(self, document: TranslationDocument, translations: Dict[str, str]) -> str:
+        """
+        用译文回填文档中的片段，并恢复被保护的代码块、表格和数学公式
+        :param document: 解析后的文档
+        :param translations: {原文片段: 译文}，缺失的片段保留原文
+        :return: 翻译后的Markdown文本
+        """
+        # 重新组合为完整的Markdown文本，合并过的行恢复原有的换行
+        translated_text = self._join_wrapped_lines(document, translations)
+        
+        # 表格的单元格译文回填到原有的标记中，替换占位符对应的还原内容
+        placeholders = document.placeholders
+        if document.tables:
+            placeholders = dict(placeholders)
+            for placeholder, pieces in document.tables.items():
+                # 单元格中的术语占位符在这里先还原，下面的一次扫描不会进入已还原的表格HTML
+                placeholders[placeholder] = self.placeholder_engine.restore(
+                    self._join_pieces(pieces, translations), document.placeholders)
+        
+        # 一次扫描恢复所有占位符
+        return self.placeholder_engine.restore(translated_text, placeholders)
+    
+    @staticmethod
+    def _join_pieces(pieces: List[Any], translations: Dict[str, str]) -> str:
+        """按顺序拼接文本和片段译文，缺失的片段保留原文"""
+        return ''.join(
+            piece if isinstance(piece, str) else translations.get(piece.text, piece.text)
+            for piece in pieces
+        )
+    
+    def _join_wrapped_lines(self, document: TranslationDocument, translations: Dict[str, str]) -> str:
+        """
+        拼接文档，由多行合并而成的行恢复换行：没有译文变化的行原样还原为合并前的各行，
+        有译文的行按原来的行宽重新折行
+        :param document: 解析后的文档
+        :param translations: {原文片段: 译文}
+        :return: 拼接后的文本
+        """
+        parts = []
+        pos = 0
+        for start, end, source in document.wrapped:
+            parts.append(self._join_pieces(document.pieces[pos:start], translations))
+            original = self._join_pieces(document.pieces[start:end], {})
+            translated = self._join_pieces(document.pieces[start:end], translations)
+            parts.append('\n'.join(source) if translated == original else self._rewrap(translated, source))
+            pos = end
+        parts.append(self._join_pieces(document.pieces[pos:], translations))
+        return ''.join(parts)
+    
+    @staticmethod
+    def _rewrap(text: str, source: List[str]) -> str:
+        """
+        按合并前各行的宽度和续行缩进重新折行
+        译文含有中日韩文字时不折行：这些文字之间的换行在渲染时会变成多余的空格；
+        折行后某一行会被识别为标题、列表等结构时也不折行
+        :param text: 译文
+        :param source: 合并前的各行
+        :return: 折行后的文本
+        """
+        if _CJK_CHAR_RE.search(text):
+            return text
+        width = max(len(line.rstrip()) for line in source)
+        indent = re.match(r'\s*', source[1]).group(0)
+        lines = textwrap.wrap(text, width=width, subsequent_indent=indent,
+                              break_long_words=False, break_on_hyphens=False)
+        if not lines or any(_STRUCTURAL_LINE_RE.match(line) for line in lines[1:]):
+            return text
+        return '\n'.join(lines)
     
-    def _restore_math_formulas(self, text: str, formulas: Dict[str, str]) -> str:
-        """
-        恢复被保护的数学公式
-        :param text: 带有占位符的文本
-        :param formulas: 公式字典
-        :return: 恢复后的文本
-        """
-        result = text
-        for placeholder, formula in formulas.items():
-            # 使用SVG或图片表示数学公式，确保在最终PDF中正确渲染
-            if placeholder.startswith("__MATH_BLOCK_"):
-                # 对于块级公式，添加居中样式
-                result = result.replace(placeholder, f'<div class="math-block">{formula}</div>')
+    def _reflow_paragraphs(self, lines: List[str]) -> Tuple[List[str], List[List[str]]]:
+        """
+        合并段落中的软换行：连续的普通文本行合并为一行，作为一个完整的句子交给翻译
+        标题、列表项、引用、表格、占位符等结构行以及空行保持不变；
+        以反斜杠或<br>结尾的硬换行不与下一行合并，行尾的两个空格不算硬换行；
+        紧跟在列表项后、带缩进的续行并入该列表项
+        :param lines: 保护占位符后的文本行
+        :return: (合并后的文本行, 每一行由哪些原始行合并而来)，空行和结构行的位置保持不变
+        """
+        result = []
+        sources = []
+        # 当前行是否可以接收下一行的续行
+        can_continue = False
+        in_list_item = False
+        
+        for line in lines:
+            is_plain = bool(line.strip()) and not _STRUCTURAL_LINE_RE.match(line) and not self._is_special_line(line)
+            is_list_item = bool(re.match(r'^\s*(?:[-*+]|\d+[.)])\s', line))
+            
+            # 普通段落中的续行，或列表项下带缩进的续行
+            if is_plain and can_continue and (not in_list_item or line[:1].isspace()):
+                result[-1] = self._join_wrapped(result[-1], line)
+                sources[-1].append(line)
             else:
-                # 对于行内公式
-                result = result.replace(placeholder, f'<span class="math-inline">{formula}</span>')
-        return result
+                result.append(line)
+                sources.append([line])
+                in_list_item = is_list_item
+                can_continue = is_plain or is_list_item
+            
+            # 硬换行之后另起一行
+            if _HARD_BREAK_RE.search(line):
+                can_continue = False
+        
+        return result, sources
+    
+    @staticmethod
+    def _join_wrapped(previous: str, line: str) -> str:
+        """
+        将软换行的下一行接到上一行末尾：小写单词在行尾用连字符断开的去掉连字符直接相连，
+        中日韩文字之间不补空格，其余补一个空格
+        """
+        previous = previous.rstrip()
+        line = line.strip()
+        if not previous or not line:
+            return f"{previous} {line}"
+        if previous.endswith('-') and previous[-2:-1].islower() and line[0].islower():
+            return previous[:-1] + line
+        if _CJK_CHAR_RE.match(previous[-1]) and _CJK_CHAR_RE.match(line[0]):
+            return previous + line
+        return f"{previous} {line}"
     
     def _is_special_line(self, line: str) -> bool:
         """
@@ -198,9 +592,13 @@ class MarkdownTranslator:
         if re.match(r'!\[.*?\]\(.*?\)', line.strip()):
             return True
         
+        # 整行只有一个占位符（代码块、表格、块级公式）
+        if PLACEHOLDER_PATTERN.fullmatch(line.strip()):
+            return True
+        
         # 数学公式占位符
         if "__MATH_" in line:
-            return False  # 我们会在_translate_line中处理这些占位符
+            return False  # 我们会在_parse_line中处理这些占位符
         
         # 代码块占位符
         if "__CODE_BLOCK_" in line:
@@ -208,11 +606,12 @@ class MarkdownTranslator:
         
         return False
     
-    def _translate_line(self, line: str) -> str:
+    def _parse_line(self, line: str, line_no: int, document: TranslationDocument) -> None:
         """
-        翻译单行文本，保持原始格式
+        解析单行文本，保持原始格式，将正文中的待翻译片段加入文档
         :param line: 原始行文本
-        :return: 翻译后的行文本
+        :param line_no: 行号
+        :param document: 正在构建的文档
         """
         # 提取行首的特殊格式（如标题的#、列表的-/*等）
         prefix_match = re.match(r'^(\s*(?:[#]+\s*|[-*+]\s*|[0-9]+\.\s*|>\s*|))', line)
@@ -225,101 +624,68 @@ class MarkdownTranslator:
         # 提取正文内容
         content = line[len(prefix):len(line)-len(suffix)] if suffix else line[len(prefix):]
         
-        # 如果内容为空，直接返回原行
+        # 如果内容为空，直接保留原行
         if not content.strip():
-            return line
+            document.add_text(line)
+            return
         
-        # 处理含有行内代码、链接等特殊元素的文本
-        parts = self._split_special_elements(content)
-        translated_parts = []
+        document.add_text(prefix)
         
-        for part, should_translate in parts:
+        # 处理含有行内代码、链接等特殊元素的文本
+        for part, should_translate in self._split_special_elements(content):
             if should_translate:
-                translated_part = self.translator.translate(part, self.source_lang, self.target_lang)
-                translated_parts.append(translated_part)
+                document.add_segment(part, line_no)
             else:
-                translated_parts.append(part)
+                document.add_text(part)
         
-        # 组合翻译后的内容
-        translated_content = ''.join(translated_parts)
-        
-        # 返回完整的翻译后行，保持原始格式
-        return f"{prefix}{translated_content}{suffix}"
+        document.add_text(suffix)
     
     def _split_special_elements(self, text: str) -> List[Tuple[str, bool]]:
         """
         分割文本中的特殊元素（代码、链接等）与普通文本
+        使用预编译的组合正则一次扫描，通过命名分组直接得知匹配到的元素类型；
+        强调和链接文本内部如果嵌套了代码、链接等需要保护的元素，再对该部分递归分割
         :param text: 要分割的文本
         :return: 分割后的部分列表，每个元素为(文本片段, 是否需要翻译)
         """
-        # 定义需要识别的特殊元素模式
-        patterns = [
-            (r'`[^`]+`', False),  # 行内代码
-            (r'\[([^\]]+)\]\(([^)]+)\)', True),  # 链接 - 只翻译显示文本
-            (r'!\[([^\]]*)\]\(([^)]+)\)', True),  # 图片 - 只翻译alt文本
-            (r'\*\*[^*]+\*\*', True),  # 粗体
-            (r'\*[^*]+\*', True),  # 斜体
-            (r'~~[^~]+~~', True),  # 删除线
-            (r'__MATH_[A-Z]+_\d+__', False),  # 数学公式占位符
-            (r'__CODE_BLOCK_\d+__', False),  # 代码块占位符
-        ]
-        
-        # 将所有模式合并为一个正则表达式
-        combined_pattern = '|'.join(f'({pattern})' for pattern, _ in patterns)
-        
-        # 找出所有特殊元素的位置
-        matches = list(re.finditer(combined_pattern, text))
         result = []
-        
-        # 如果没有特殊元素，直接返回整个文本
-        if not matches:
-            return [(text, True)]
-        
-        # 分割文本
         last_end = 0
-        for match in matches:
+        
+        for match in _INLINE_LEXER.finditer(text):
             start, end = match.span()
             
             # 添加特殊元素前的普通文本
             if start > last_end:
                 result.append((text[last_end:start], True))
             
-            # 找出匹配的是哪种特殊元素
-            for i, (pattern, should_translate) in enumerate(patterns):
-                if re.match(pattern, match.group(0)):
-                    # 如果是链接，只翻译显示文本部分
-                    if pattern == r'\[([^\]]+)\]\(([^)]+)\)':
-                        link_match = re.match(pattern, match.group(0))
-                        if link_match:
-                            display_text = link_match.group(1)
-                            url = link_match.group(2)
-                            if should_translate:
-                                # 只翻译显示文本，URL保持不变
-                                translated_display = self.translator.translate(
-                                    display_text, self.source_lang, self.target_lang
-                                )
-                                result.append((f"[{translated_display}]({url})", False))
-                            else:
-                                result.append((match.group(0), False))
-                        break
-                    # 图片处理 - 只翻译alt文本
-                    elif pattern == r'!\[([^\]]*)\]\(([^)]+)\)':
-                        img_match = re.match(pattern, match.group(0))
-                        if img_match:
-                            alt_text = img_match.group(1)
-                            img_url = img_match.group(2)
-                            if should_translate and alt_text.strip():
-                                # 只翻译alt文本，URL保持不变
-                                translated_alt = self.translator.translate(
-                                    alt_text, self.source_lang, self.target_lang
-                                )
-                                result.append((f"![{translated_alt}]({img_url})", False))
-                            else:
-                                result.append((match.group(0), False))
-                        break
-                    else:
-                        result.append((match.group(0), should_translate))
-                        break
+            kind = match.lastgroup
+            if kind == 'link':
+                # 链接只翻译显示文本，URL保持不变
+                result.append(("[", False))
+                result.extend(self._split_nested(match.group('link_text')))
+                result.append((f"]({match.group('link_url')})", False))
+            elif kind == 'image':
+                # 图片只翻译alt文本，URL保持不变
+                alt_text = match.group('image_alt')
+                if alt_text.strip():
+                    result.append(("![", False))
+                    result.extend(self._split_nested(alt_text))
+                    result.append((f"]({match.group('image_url')})", False))
+                else:
+                    result.append((match.group(0), False))
+            elif kind in _EMPHASIS_MARKERS:
+                inner = match.group(f'{kind}_text')
+                if _PROTECTED_INLINE_RE.search(inner):
+                    # 强调内部嵌套了链接、代码等元素，标记保持不变，内部递归分割
+                    marker = _EMPHASIS_MARKERS[kind]
+                    result.append((marker, False))
+                    result.extend(self._split_special_elements(inner))
+                    result.append((marker, False))
+                else:
+                    result.append((match.group(0), True))
+            else:
+                # 行内代码和各类占位符不翻译
+                result.append((match.group(0), False))
             
             last_end = end
         
@@ -327,4 +693,10 @@ class MarkdownTranslator:
         if last_end < len(text):
             result.append((text[last_end:], True))
         
-        return result 
\ No newline at end of file
+        return result
+    
+    def _split_nested(self, text: str) -> List[Tuple[str, bool]]:
+        """分割链接文本或图片alt文本，内部没有需要保护的元素时整体作为一个待翻译片段"""
+        if _PROTECTED_INLINE_RE.search(text):
+            return self._split_special_elements(text)
+        return [(text, True)]
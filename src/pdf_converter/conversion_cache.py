@@ -0,0 +1,275 @@
+"""
+PDF转换结果缓存：以PDF内容的SHA-256、解析方式、magic_pdf版本和转换选项为键，
+保存Markdown、图片以及content_list/middle JSON，重复上传的文档直接复制缓存的结果
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+
+# 缓存目录中各文件的固定名称，复制到输出目录时再按文档名重命名
+_MARKDOWN_FILE = "document.md"
+_CONTENT_LIST_FILE = "content_list.json"
+_MIDDLE_JSON_FILE = "middle.json"
+_IMAGE_DIR = "images"
+
+
+def magic_pdf_version():
+    """
+    获取magic_pdf的版本号，升级后解析结果可能不同，旧的缓存不应再命中
+
+    返回:
+        str: 版本号，无法获取时返回'unknown'
+    """
+    try:
+        from magic_pdf.libs.version import __version__
+        return __version__
+    except ImportError:
+        pass
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        return version("magic-pdf")
+    except (ImportError, PackageNotFoundError):
+        return "unknown"
+
+
+def make_conversion_key(pdf_bytes, parse_method="auto", options=None):
+    """
+    生成转换结果的缓存键
+
+    参数:
+        pdf_bytes: PDF的字节内容
+        parse_method: 解析方式
+        options: 其他会影响转换结果的选项
+
+    返回:
+        str: 十六进制的SHA-256摘要
+    """
+    pdf_hash = hashlib.sha256(pdf_bytes).hexdigest()
+    descriptor = json.dumps([parse_method, magic_pdf_version(), options or {}], sort_keys=True)
+    return hashlib.sha256(f"{pdf_hash}\0{descriptor}".encode('utf-8')).hexdigest()
+
+
+def _directory_size(path):
+    """统计目录中所有文件的总大小（字节）"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+class ConversionCache:
+    """
+    磁盘上的PDF转换结果缓存
+    每个条目是一个目录，SQLite索引记录条目大小和最近访问时间，
+    总大小超过上限时按LRU淘汰最久未访问的条目
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        """
+        参数:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        # Web服务在多个线程中处理请求，连接由锁保护
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversions ("
+                "key TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_conversions_accessed_at ON conversions (accessed_at)"
+            )
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def restore(self, key, output_dir, name, image_dir="images"):
+        """
+        将缓存的转换结果复制到输出目录
+
+        参数:
+            key: 缓存键
+            output_dir: 输出目录
+            name: 文档名（不含扩展名），输出文件按其命名
+            image_dir: Markdown中引用的图片目录名
+
+        返回:
+            dict: 命中时返回 markdown、content_list、middle_json 的路径，未命中时返回None
+        """
+        entry_dir = self._entry_dir(key)
+        # 复制也在锁内进行：store淘汰条目时同样持有锁，复制途中条目不会被删除或替换
+        with self._lock:
+            row = self._conn.execute("SELECT key FROM conversions WHERE key = ?", (key,)).fetchone()
+            if row is None or not os.path.isdir(entry_dir):
+                if row is not None:
+                    # 索引与磁盘不一致（条目目录被手动删除），清理索引
+                    with self._conn:
+                        self._conn.execute("DELETE FROM conversions WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            paths = self._copy_entry(entry_dir, output_dir, name, image_dir)
+            with self._conn:
+                self._conn.execute("UPDATE conversions SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return paths
+
+    @staticmethod
+    def _copy_entry(entry_dir, output_dir, name, image_dir):
+        """将一个条目的文件复制到输出目录（调用方需持有锁）"""
+        os.makedirs(output_dir, exist_ok=True)
+        cached_images = os.path.join(entry_dir, _IMAGE_DIR)
+        if os.path.isdir(cached_images):
+            shutil.copytree(cached_images, os.path.join(output_dir, image_dir), dirs_exist_ok=True)
+
+        paths = {
+            "markdown": os.path.join(output_dir, f"{name}.md"),
+            "content_list": os.path.join(output_dir, f"{name}_content_list.json"),
+            "middle_json": os.path.join(output_dir, f"{name}_middle.json"),
+        }
+        shutil.copyfile(os.path.join(entry_dir, _MARKDOWN_FILE), paths["markdown"])
+        for field, cached_name in (("content_list", _CONTENT_LIST_FILE), ("middle_json", _MIDDLE_JSON_FILE)):
+            cached_path = os.path.join(entry_dir, cached_name)
+            if os.path.exists(cached_path):
+                shutil.copyfile(cached_path, paths[field])
+            else:
+                paths[field] = None
+        return paths
+
+    def store(self, key, markdown_path, local_image_dir, content_list_path=None, middle_json_path=None):
+        """
+        保存一次转换的结果，保存后按LRU淘汰超出容量的条目；单个结果就超过容量上限时不保存
+
+        参数:
+            key: 缓存键
+            markdown_path: 生成的Markdown文件
+            local_image_dir: 提取的图片目录
+            content_list_path: 内容列表JSON文件
+            middle_json_path: 中间处理结果JSON文件
+        """
+        entry_dir = self._entry_dir(key)
+        # 先写入临时目录再改名，并发转换同一文档或中途失败时不会留下不完整的条目
+        tmp_dir = f"{entry_dir}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(tmp_dir)
+        try:
+            shutil.copyfile(markdown_path, os.path.join(tmp_dir, _MARKDOWN_FILE))
+            self._copy_referenced_images(local_image_dir, os.path.join(tmp_dir, _IMAGE_DIR),
+                                         [markdown_path, content_list_path])
+            if content_list_path and os.path.exists(content_list_path):
+                shutil.copyfile(content_list_path, os.path.join(tmp_dir, _CONTENT_LIST_FILE))
+            if middle_json_path and os.path.exists(middle_json_path):
+                shutil.copyfile(middle_json_path, os.path.join(tmp_dir, _MIDDLE_JSON_FILE))
+            size = _directory_size(tmp_dir)
+            if size > self.max_bytes:
+                # 单个条目就超过上限时，写入后会被立即淘汰，不必缓存
+                print(f"转换结果 {size / 1024 ** 2:.1f} MB 超过缓存上限 {self.max_bytes / 1024 ** 2:.1f} MB，不缓存")
+                return
+
+            with self._lock:
+                if os.path.isdir(entry_dir):
+                    shutil.rmtree(entry_dir)
+                os.replace(tmp_dir, entry_dir)
+                now = time.time()
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO conversions (key, size, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                        (key, size, now, now)
+                    )
+                self._evict()
+        finally:
+            if os.path.isdir(tmp_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _copy_referenced_images(local_image_dir, target_dir, referencing_files):
+        """
+        只复制文档中引用到的图片；输出目录可能被多个文档共用，图片目录中会有其他文档的图片
+        """
+        if not os.path.isdir(local_image_dir):
+            return
+        text = ""
+        for path in referencing_files:
+            if path and os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    text += f.read()
+        for root, _, files in os.walk(local_image_dir):
+            for name in files:
+                source = os.path.join(root, name)
+                relative = os.path.relpath(source, local_image_dir)
+                if relative.replace(os.sep, '/') in text:
+                    target = os.path.join(target_dir, relative)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copyfile(source, target)
+
+    def _evict(self):
+        """按最近访问时间淘汰条目，直到总大小不超过上限（调用方需持有锁）"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM conversions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM conversions ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+        with self._conn:
+            self._conn.executemany("DELETE FROM conversions WHERE key = ?", [(key,) for key in evicted])
+        for key in evicted:
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def stats(self):
+        """
+        获取缓存统计信息
+
+        返回:
+            dict: 包含hits、misses、entries、bytes的字典
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM conversions"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def close(self):
+        """关闭索引数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_conversion_cache(cache_dir, max_bytes=2 * 1024 ** 3):
+    """
+    获取指定目录的转换结果缓存，同一进程中同一目录共用一个实例
+
+    参数:
+        cache_dir: 缓存目录
+        max_bytes: 缓存总大小上限（字节）
+
+    返回:
+        ConversionCache: 缓存实例
+    """
+    cache_dir = os.path.abspath(cache_dir)
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = _caches[cache_dir] = ConversionCache(cache_dir, max_bytes)
+        return cache
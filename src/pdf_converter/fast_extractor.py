@@ -0,0 +1,261 @@
+"""
+纯PyMuPDF的快速提取：只有文本层、没有公式、表格和插图的简单PDF不必经过版面、OCR和公式模型，
+直接从文本层提取，按字号识别标题，按版面推断阅读顺序，
+输出与MinerU相同格式的Markdown、图片目录和content_list/middle JSON
+"""
+
+import hashlib
+import re
+from collections import Counter
+
+import fitz
+
+from pdf_converter.page_router import page_needs_ocr
+from pdf_converter.sharded_parser import join_lines, merge_shard_markdown
+
+
+# 图片覆盖面积超过页面的该比例时视为插图，文档交给MinerU处理
+MAX_IMAGE_COVERAGE = 0.05
+# 一页中的矢量图形（线段、矩形、曲线）超过该数量时，通常是表格或图表
+MAX_DRAWINGS_PER_PAGE = 20
+# 公式中的字符超过该数量时视为含有公式
+MAX_MATH_CHARS = 5
+# 常见的数学字体（TeX的Computer Modern数学字体、AMS符号字体、STIX、Cambria Math等）
+_MATH_FONT_RE = re.compile(r'CMMI|CMSY|CMEX|MSAM|MSBM|Math|STIX|Symbol|rsfs|esint', re.IGNORECASE)
+# 数学运算符、箭头、希腊字母之外的数学字母数字符号等
+_MATH_CHAR_RE = re.compile(r'[\u2200-\u22ff\u27c0-\u27ef\u2980-\u2aff\U0001d400-\U0001d7ff]')
+
+# 字号比正文大出该比例的文本块视为标题
+HEADING_SIZE_RATIO = 1.15
+# 页眉页脚所在的页面上下边缘区域占页面高度的比例
+MARGIN_RATIO = 0.06
+# 以句末标点结尾的粗体行不是标题
+_TERMINAL_PUNCT_RE = re.compile(r'[.!?。！？:：;；,，]$')
+# 页码：阿拉伯数字或合法的罗马数字（可带page前缀和“/总页数”）、“第N页”、“- N -”；
+# 罗马数字按完整的记数规则匹配，civic、ill、vivid这类只由i、v、x、l、c组成的单词不算页码
+_PAGE_NUMBER_RE = re.compile(
+    r'^(?:page\s*)?(?:\d+|(?=[mdclxvi])m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3}))(?:\s*/\s*\d+)?$'
+    r'|^第\s*\d+\s*页$|^-\s*\d+\s*-$',
+    re.IGNORECASE
+)
+# 页码文本的最大长度，更长的文本块不按页码丢弃
+MAX_PAGE_NUMBER_CHARS = 16
+
+
+def probe_simple_document(pdf_bytes):
+    """
+    判断文档是否适合快速提取：每一页都有可用的文本层，并且没有插图、表格和公式
+
+    参数:
+        pdf_bytes: PDF的字节内容
+
+    返回:
+        tuple: (是否适合, 原因)
+    """
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        if doc.page_count == 0:
+            return False, "文档没有页面"
+        for page in doc:
+            page_no = page.number + 1
+            if page_needs_ocr(page):
+                return False, f"第 {page_no} 页需要OCR"
+
+            page_area = abs(page.rect) or 1
+            image_area = 0
+            for image in page.get_images(full=True):
+                for rect in page.get_image_rects(image[0]):
+                    image_area += abs(rect & page.rect)
+            if image_area / page_area > MAX_IMAGE_COVERAGE:
+                return False, f"第 {page_no} 页含有插图"
+
+            if len(page.get_drawings()) > MAX_DRAWINGS_PER_PAGE:
+                return False, f"第 {page_no} 页含有表格或图形"
+
+            math_chars = 0
+            for block in page.get_text("dict")["blocks"]:
+                for line in block.get("lines", []):
+                    for span in line["spans"]:
+                        if _MATH_FONT_RE.search(span["font"]):
+                            math_chars += len(span["text"].strip())
+                        else:
+                            math_chars += len(_MATH_CHAR_RE.findall(span["text"]))
+            if math_chars > MAX_MATH_CHARS:
+                return False, f"第 {page_no} 页含有公式"
+    return True, "纯文本文档"
+
+
+def _block_text(block):
+    """拼接文本块中的各行，返回 (文本, 按字符数加权的平均字号, 是否全部为粗体, 行数)"""
+    text = ""
+    size_total = 0.0
+    char_total = 0
+    bold = True
+    lines = 0
+    for line in block["lines"]:
+        line_text = "".join(span["text"] for span in line["spans"]).strip()
+        if not line_text:
+            continue
+        for span in line["spans"]:
+            chars = len(span["text"].strip())
+            size_total += span["size"] * chars
+            char_total += chars
+            if chars and not span["flags"] & 16:
+                bold = False
+        text = join_lines(text, line_text) if text else line_text
+        lines += 1
+    size = size_total / char_total if char_total else 0.0
+    return text, size, bold, lines
+
+
+def _is_margin(bbox, page_height):
+    """文本块是否位于页面的上下边缘"""
+    return bbox[3] <= page_height * MARGIN_RATIO or bbox[1] >= page_height * (1 - MARGIN_RATIO)
+
+
+def _is_page_number(block):
+    """只有一行、文本很短且符合页码格式的文本块视为页码"""
+    text = block["text"].strip()
+    return block["lines"] == 1 and len(text) <= MAX_PAGE_NUMBER_CHARS and bool(_PAGE_NUMBER_RE.match(text))
+
+
+def _margin_signature(text):
+    """页眉页脚的特征：把数字替换掉，使“第3页”“第4页”这样只有页码不同的文本视为同一个"""
+    return re.sub(r'\d+', '#', text.strip().lower())
+
+
+def _reading_order(items, page_width):
+    """
+    推断阅读顺序：跨越页面中线的通栏块把页面分成若干段，
+    每一段中先读左栏再读右栏，栏内从上到下
+
+    参数:
+        items: 带有bbox的块列表
+        page_width: 页面宽度
+
+    返回:
+        list: 按阅读顺序排列的块
+    """
+    mid = page_width / 2
+    tolerance = page_width * 0.02
+    ordered = []
+    left, right = [], []
+
+    def flush():
+        ordered.extend(sorted(left, key=lambda item: item["bbox"][1]))
+        ordered.extend(sorted(right, key=lambda item: item["bbox"][1]))
+        left.clear()
+        right.clear()
+
+    for item in sorted(items, key=lambda item: (item["bbox"][1], item["bbox"][0])):
+        x0, _, x1, _ = item["bbox"]
+        if x1 <= mid + tolerance:
+            left.append(item)
+        elif x0 >= mid - tolerance:
+            right.append(item)
+        else:
+            flush()
+            ordered.append(item)
+    flush()
+    return ordered
+
+
+def _save_image(page, rect, image_writer):
+    """
+    以MinerU相同的方式保存图片：按3倍分辨率截取页面区域，以内容的SHA-256命名
+
+    返回:
+        str: 图片文件名
+    """
+    data = page.get_pixmap(matrix=fitz.Matrix(3, 3), clip=rect).tobytes("jpeg")
+    name = f"{hashlib.sha256(data).hexdigest()}.jpg"
+    image_writer.write(name, data)
+    return name
+
+
+def extract_markdown(pdf_bytes, image_writer, image_dir):
+    """
+    用PyMuPDF直接从文本层提取Markdown
+
+    参数:
+        pdf_bytes: PDF的字节内容
+        image_writer: 图片写入器
+        image_dir: Markdown中引用图片目录时使用的相对路径
+
+    返回:
+        tuple: (Markdown文本, 内容列表, 中间处理结果)
+    """
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        pages = []
+        size_counter = Counter()
+        margin_counter = Counter()
+        for page in doc:
+            blocks = []
+            for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+                if block.get("type", 0) != 0:
+                    continue
+                text, size, bold, lines = _block_text(block)
+                if not text:
+                    continue
+                blocks.append({"bbox": block["bbox"], "text": text, "size": size, "bold": bold, "lines": lines})
+                size_counter[round(size, 1)] += len(text)
+                if _is_margin(block["bbox"], page.rect.height):
+                    margin_counter[_margin_signature(text)] += 1
+            pages.append(blocks)
+
+        # 正文字号取出现字符最多的字号；在一半以上页面的边缘重复出现的文本视为页眉页脚
+        body_size = size_counter.most_common(1)[0][0] if size_counter else 0
+        repeated = {signature for signature, count in margin_counter.items()
+                    if count >= 2 and count >= len(pages) / 2}
+
+        page_parts = []
+        content_list = []
+        pdf_info = []
+        for page, blocks in zip(doc, pages):
+            page_height = page.rect.height
+            items = []
+            discarded = []
+            for block in blocks:
+                if _is_margin(block["bbox"], page_height) and (
+                        _margin_signature(block["text"]) in repeated or _is_page_number(block)):
+                    discarded.append({"type": "discarded", "bbox": list(block["bbox"]), "text": block["text"]})
+                    continue
+                is_heading = block["lines"] <= 3 and len(block["text"]) <= 200 and (
+                    block["size"] >= body_size * HEADING_SIZE_RATIO
+                    or (block["bold"] and block["lines"] == 1 and len(block["text"]) <= 80
+                        and not _TERMINAL_PUNCT_RE.search(block["text"])))
+                items.append(dict(block, type="title" if is_heading else "text"))
+
+            for image in page.get_images(full=True):
+                for rect in page.get_image_rects(image[0]):
+                    rect = rect & page.rect
+                    if abs(rect):
+                        items.append({"type": "image", "bbox": tuple(rect), "rect": rect})
+
+            markdown_blocks = []
+            para_blocks = []
+            for item in _reading_order(items, page.rect.width):
+                if item["type"] == "image":
+                    img_path = f"{image_dir}/{_save_image(page, item['rect'], image_writer)}"
+                    markdown_blocks.append(f"![]({img_path})")
+                    content_list.append({"type": "image", "img_path": img_path, "img_caption": [],
+                                         "img_footnote": [], "page_idx": page.number})
+                elif item["type"] == "title":
+                    markdown_blocks.append(f"# {item['text']}")
+                    content_list.append({"type": "text", "text": item["text"], "text_level": 1,
+                                         "page_idx": page.number})
+                else:
+                    markdown_blocks.append(item["text"])
+                    content_list.append({"type": "text", "text": item["text"], "page_idx": page.number})
+                para_blocks.append({"type": item["type"], "bbox": list(item["bbox"]), "text": item.get("text", "")})
+
+            page_parts.append("\n\n".join(markdown_blocks))
+            pdf_info.append({
+                "page_idx": page.number,
+                "page_size": [page.rect.width, page.rect.height],
+                "para_blocks": para_blocks,
+                "discarded_blocks": discarded,
+            })
+
+    # 与MinerU一样把跨页的段落接起来
+    middle_json = {"pdf_info": pdf_info, "_parse_type": "txt", "_version_name": "pymupdf-fast"}
+    return merge_shard_markdown(page_parts), content_list, middle_json
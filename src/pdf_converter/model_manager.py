@@ -0,0 +1,213 @@
+"""
+PDF分析模型管理：每个工作进程只加载一次magic_pdf的版面、OCR和公式模型，
+供之后的所有文档复用，并记录加载耗时和内存占用
+"""
+
+import os
+import threading
+import time
+
+from magic_pdf.model.doc_analyze_by_custom_model import ModelSingleton
+
+
+# 预热设置与需要预先加载的模式：文本模式的模型组与OCR模式的模型组各占一份内存（显存）
+WARMUP_MODES = {
+    "text": (False,),
+    "ocr": (True,),
+    "all": (False, True),
+}
+
+
+def warmup_modes(setting):
+    """
+    将预热设置转换为需要预先加载的模式
+
+    参数:
+        setting: False/None（不预热）、"text"、"ocr"、"all"，True等同于"all"
+
+    返回:
+        tuple: 需要加载的模式（是否OCR），不预热时为空
+    """
+    if not setting:
+        return ()
+    if setting is True:
+        return WARMUP_MODES["all"]
+    if setting not in WARMUP_MODES:
+        raise ValueError(f"不支持的模型预热设置: {setting}，可选值为 {', '.join(WARMUP_MODES)}")
+    return WARMUP_MODES[setting]
+
+
+def _current_rss():
+    """
+    获取当前进程的常驻内存（字节），无法获取时返回None
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def _gpu_memory():
+    """
+    获取当前进程已分配的显存（字节），未使用GPU时返回None
+    """
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return torch.cuda.memory_allocated()
+    except ImportError:
+        pass
+    return None
+
+
+class ModelManager:
+    """
+    进程级的分析模型管理器
+    magic_pdf的ModelSingleton按参数缓存模型，但只在第一次分析文档时才加载；
+    管理器在服务启动时提前加载；每组模型各有一把加载锁，保证并发的首个请求不会重复加载同一组模型，
+    而加载一组模型时，其他已加载的模型组和stats()不受影响
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()    # 只保护下面几个字典，不在加载模型期间持有
+        self._loaded = {}   # {(ocr, lang): 加载信息}
+        self._loading = {}  # {(ocr, lang): 开始加载的时间}
+        self._load_locks = {}  # {(ocr, lang): 该组模型的加载锁}
+        self._warmup_thread = None
+
+    @classmethod
+    def instance(cls):
+        """
+        获取当前进程的模型管理器
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def ensure_loaded(self, ocr, lang=None):
+        """
+        确保指定模式的分析模型已加载，已加载时立即返回
+
+        参数:
+            ocr: 是否为OCR模式
+            lang: OCR语言，与doc_analyze的lang参数一致
+
+        返回:
+            dict: 该组模型的加载信息
+        """
+        key = (ocr, lang)
+        with self._lock:
+            info = self._loaded.get(key)
+            if info is not None:
+                return info
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # 同一组模型的并发请求在这里等待第一个请求加载完成
+        with load_lock:
+            with self._lock:
+                info = self._loaded.get(key)
+                if info is not None:
+                    return info
+                self._loading[key] = time.time()
+
+            try:
+                rss_before = _current_rss()
+                gpu_before = _gpu_memory()
+                start = time.perf_counter()
+                # 参数与doc_analyze的默认参数一致，才能命中ModelSingleton中的同一组模型
+                ModelSingleton().get_model(ocr, False, lang, None, None, None)
+                seconds = time.perf_counter() - start
+                rss_after = _current_rss()
+                gpu_after = _gpu_memory()
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+            rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            gpu_delta = gpu_after - gpu_before if gpu_before is not None and gpu_after is not None else None
+            info = {
+                "ocr": ocr,
+                "lang": lang,
+                "load_seconds": round(seconds, 2),
+                "rss_bytes": rss_after,
+                "rss_delta_bytes": rss_delta,
+                "gpu_delta_bytes": gpu_delta,
+            }
+            with self._lock:
+                self._loaded[key] = info
+
+            message = f"分析模型已加载 ({'OCR' if ocr else '文本'}模式): 用时 {seconds:.1f} 秒"
+            if rss_delta is not None:
+                message += f", 内存增加 {rss_delta / 1024 ** 2:.0f} MB"
+            print(message)
+            return info
+
+    def warm_up(self, ocr_modes=(False,), lang=None):
+        """
+        预先加载各模式的分析模型
+
+        参数:
+            ocr_modes: 需要加载的模式，默认只加载文本模式，见warmup_modes
+            lang: OCR语言
+
+        返回:
+            list: 各组模型的加载信息
+        """
+        return [self.ensure_loaded(ocr, lang) for ocr in ocr_modes]
+
+    def warm_up_async(self, ocr_modes=(False,), lang=None):
+        """
+        在后台线程中预先加载模型，服务可以立即开始监听；
+        预热期间到达的文档会在ensure_loaded处等待，而不会重复加载
+
+        返回:
+            threading.Thread: 预热线程
+        """
+        if self._warmup_thread is None:
+            def run():
+                try:
+                    self.warm_up(ocr_modes, lang)
+                except Exception as e:
+                    print(f"分析模型预热失败，将在处理第一个文档时加载: {e}")
+
+            self._warmup_thread = threading.Thread(target=run, name="model-warmup", daemon=True)
+            self._warmup_thread.start()
+        return self._warmup_thread
+
+    def stats(self):
+        """
+        获取模型加载情况
+
+        返回:
+            dict: 已加载的模型组、各自的加载耗时和内存占用，正在加载的模型组，以及当前进程的内存
+        """
+        with self._lock:
+            loaded = list(self._loaded.values())
+            now = time.time()
+            loading = [{"ocr": ocr, "lang": lang, "elapsed_seconds": round(now - started, 1)}
+                       for (ocr, lang), started in self._loading.items()]
+        return {
+            "pid": os.getpid(),
+            "warming_up": bool(self._warmup_thread and self._warmup_thread.is_alive()),
+            "loading": loading,
+            "models": loaded,
+            "rss_bytes": _current_rss(),
+            "gpu_bytes": _gpu_memory(),
+        }
+
+
+def get_model_manager():
+    """
+    获取当前进程的模型管理器
+    """
+    return ModelManager.instance()
@@ -0,0 +1,96 @@
+"""
+按页选择解析模式：用PyMuPDF检查每一页的文本层，有可用文本层的页面走文本模式，
+只有扫描页（没有文本层或文本层是乱码）才走OCR模式
+"""
+
+import unicodedata
+
+import fitz
+
+
+# 一页中至少有这么多个非空白字符，才认为文本层可用
+DEFAULT_MIN_PAGE_CHARS = 30
+# 文本层中乱码字符（替换字符、私用区字符、控制字符）的比例超过该值时，按扫描页处理
+GARBLED_RATIO = 0.1
+# 文字很少的页面中，图片覆盖面积超过该比例时按扫描页处理；否则视为空白页或纯图表页，走文本模式
+SCANNED_IMAGE_COVERAGE = 0.5
+# 紧挨着扫描页、少于该页数的文本页并入OCR：多OCR几页的开销远小于为它们单独建立数据集和流水线
+DEFAULT_MIN_RUN_PAGES = 5
+
+
+def page_needs_ocr(page, min_chars=DEFAULT_MIN_PAGE_CHARS):
+    """
+    判断一页是否需要OCR
+
+    参数:
+        page: PyMuPDF的页面对象
+        min_chars: 文本层可用所需的最少字符数
+
+    返回:
+        bool: 需要OCR时返回True
+    """
+    chars = [ch for ch in page.get_text("text") if not ch.isspace()]
+    if chars:
+        garbled = sum(1 for ch in chars if ch == '\ufffd' or unicodedata.category(ch) in ('Co', 'Cc'))
+        if garbled / len(chars) > GARBLED_RATIO:
+            return True
+    if len(chars) >= min_chars:
+        return False
+
+    page_area = abs(page.rect)
+    if not page_area:
+        return False
+    image_area = 0
+    for image in page.get_images(full=True):
+        for rect in page.get_image_rects(image[0]):
+            image_area += abs(rect & page.rect)
+    return image_area / page_area >= SCANNED_IMAGE_COVERAGE
+
+
+def classify_pages(pdf_bytes, min_chars=DEFAULT_MIN_PAGE_CHARS):
+    """
+    逐页判断是否需要OCR
+
+    参数:
+        pdf_bytes: PDF的字节内容
+        min_chars: 文本层可用所需的最少字符数
+
+    返回:
+        list: 每一页是否需要OCR
+    """
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return [page_needs_ocr(page, min_chars) for page in doc]
+
+
+def _merge_adjacent(runs):
+    """合并相邻且模式相同的页范围"""
+    merged = []
+    for start, end, ocr in runs:
+        if merged and merged[-1][2] == ocr:
+            merged[-1] = (merged[-1][0], end, ocr)
+        else:
+            merged.append((start, end, ocr))
+    return merged
+
+
+def group_page_runs(page_modes, min_run_pages=DEFAULT_MIN_RUN_PAGES):
+    """
+    将相邻且模式相同的页合并为页范围；与扫描页相邻的过短文本页范围并入OCR，
+    避免文本页和扫描页交替时产生大量只有一两页的分片
+    扫描页不能改用文本模式，过短的OCR页范围保持不变
+
+    参数:
+        page_modes: 每一页是否需要OCR
+        min_run_pages: 文本页范围的最少页数
+
+    返回:
+        list: [(起始页, 结束页, 是否OCR)] 列表（结束页不含）
+    """
+    runs = _merge_adjacent((index, index + 1, ocr) for index, ocr in enumerate(page_modes))
+    if len(runs) <= 1:
+        return runs
+    # 合并后只剩OCR与文本交替的页范围，文本范围的两侧必然是OCR范围（或文档边界）
+    return _merge_adjacent(
+        (start, end, ocr or end - start < min_run_pages)
+        for start, end, ocr in runs
+    )
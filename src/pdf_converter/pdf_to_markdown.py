@@ -1,23 +1,43 @@
 import os
+import sys
 import json
+
+# 直接作为脚本运行时（python src/pdf_converter/pdf_to_markdown.py），将src目录添加到系统路径中，以便导入pdf_converter包
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 from magic_pdf.data.data_reader_writer import FileBasedDataWriter, FileBasedDataReader
 from magic_pdf.data.dataset import PymuDocDataset
 from magic_pdf.model.doc_analyze_by_custom_model import doc_analyze
 from magic_pdf.config.enums import SupportedPdfParseMethod
+from pdf_converter.model_manager import get_model_manager
+from pdf_converter.sharded_parser import plan_shards, parse_sharded, shard_settings
+from pdf_converter.page_router import classify_pages, group_page_runs
+from pdf_converter.conversion_cache import make_conversion_key, get_conversion_cache
+from pdf_converter.fast_extractor import probe_simple_document, extract_markdown
 
-def pdf_to_markdown(pdf_file_path, output_base_dir="output"):
+def pdf_to_markdown(pdf_file_path, output_base_dir="output", shard_pages=None, shard_workers=None, cache=None,
+                hybrid_ocr=True, engine="auto"):
     """
     将PDF文件转换为Markdown格式，同时提取图片
     
     参数:
         pdf_file_path: 输入的PDF文件路径
         output_base_dir: 输出文件的基础目录
+        shard_pages: 分片页数，页数超过该值的PDF拆分为多个分片并行解析
+        shard_workers: 并行解析分片的进程数，为1时不分片
+        cache: 转换结果缓存（ConversionCache），为None时不使用缓存
+        hybrid_ocr: 是否按页选择解析模式，只对没有可用文本层的页面使用OCR
+        engine: 解析引擎，'mineru'使用MinerU的模型，'fast'直接用PyMuPDF提取文本层，
+                'auto'先预检文档，简单的纯文本PDF使用'fast'，其余使用'mineru'
     
     返回:
         dict: 包含处理结果的字典，包括:
             - status: 'success'或'error'
             - markdown: 生成的Markdown文件路径
             - output_dir: 输出目录的绝对路径
+            - content_list: 内容列表JSON文件路径
+            - middle_json: 中间处理结果JSON文件路径
+            - cached: 结果是否来自缓存
             - message: 如果出错，包含错误信息
     """
     # 准备输出目录结构
@@ -40,26 +60,96 @@ def pdf_to_markdown(pdf_file_path, output_base_dir="output"):
     pdf_bytes = reader.read(pdf_file_path)
     
     try:
-        # 创建数据集实例
-        print("正在初始化PDF分析器...")
-        ds = PymuDocDataset(pdf_bytes)
+        # 同一份PDF在相同的解析方式、magic_pdf版本和分片设置下转换结果相同，命中缓存时直接复制
+        cache_key = None
+        if cache is not None:
+            pages_per_shard, workers = shard_settings(shard_pages, shard_workers)
+            cache_key = make_conversion_key(pdf_bytes, "auto", {
+                "engine": engine,
+                "shard_pages": pages_per_shard if workers > 1 else None,
+                "hybrid_ocr": bool(hybrid_ocr),
+            })
+            cached = cache.restore(cache_key, local_md_dir, name_without_suff, image_dir)
+            if cached:
+                print(f"命中转换缓存，跳过PDF解析: {cached['markdown']}")
+                return {
+                    "status": "success",
+                    "markdown": cached["markdown"],
+                    "output_dir": os.path.abspath(output_base_dir),
+                    "content_list": cached["content_list"],
+                    "middle_json": cached["middle_json"],
+                    "cached": True
+                }
+        
+        md_path = os.path.join(local_md_dir, f"{name_without_suff}.md")
+        content_list_path = os.path.join(local_md_dir, f"{name_without_suff}_content_list.json")
+        middle_json_path = os.path.join(local_md_dir, f"{name_without_suff}_middle.json")
+        
+        # 选择解析引擎：没有公式、表格和插图的纯文本PDF直接用PyMuPDF提取，不必加载分析模型
+        if engine not in ("auto", "mineru", "fast"):
+            raise ValueError(f"未知的PDF解析引擎: {engine}")
+        use_fast = engine == "fast"
+        if engine == "auto":
+            use_fast, reason = probe_simple_document(pdf_bytes)
+            print(f"文档预检: {reason}，使用{'PyMuPDF快速提取' if use_fast else 'MinerU解析'}")
         
-        # 分类并处理PDF
-        print("正在分析PDF类型...")
-        if ds.classify() == SupportedPdfParseMethod.OCR:
-            print("检测为OCR类型PDF，使用OCR模式处理...")
-            infer_result = ds.apply(doc_analyze, ocr=True)
-            pipe_result = infer_result.pipe_ocr_mode(image_writer)
+        extracted = None
+        if use_fast:
+            print("正在用PyMuPDF提取文本层...")
+            extracted = extract_markdown(pdf_bytes, image_writer, image_dir)
         else:
-            print("检测为文本类型PDF，使用文本模式处理...")
-            infer_result = ds.apply(doc_analyze, ocr=False)
-            pipe_result = infer_result.pipe_txt_mode(image_writer)
+            # 创建数据集实例
+            print("正在初始化PDF分析器...")
+            ds = PymuDocDataset(pdf_bytes)
         
-        # 生成并保存Markdown
-        print("生成Markdown文档...")
-        md_content = pipe_result.get_markdown(image_dir)
-        md_path = os.path.join(local_md_dir, f"{name_without_suff}.md")
-        pipe_result.dump_md(md_writer, f"{name_without_suff}.md", image_dir)
+            # 分类并处理PDF
+            print("正在分析PDF类型...")
+            page_modes = classify_pages(pdf_bytes) if hybrid_ocr else None
+            if page_modes and any(page_modes) and not all(page_modes):
+                # 文本页与扫描页混合：有文本层的页面走文本模式，只有扫描页走OCR
+                page_runs = group_page_runs(page_modes)
+                print(f"检测为混合类型PDF，共 {len(page_modes)} 页，其中 {sum(page_modes)} 页需要OCR")
+            else:
+                page_runs = [(0, len(ds), ds.classify() == SupportedPdfParseMethod.OCR)]
+            ocr = page_runs[0][2]
+            shards = plan_shards(page_runs, shard_pages, shard_workers)
+            if shards:
+                # 混合类型或页数较多的PDF按页范围分片解析，各分片使用各自的解析模式
+                print(f"共 {len(ds)} 页，分片处理...")
+                extracted = parse_sharded(pdf_bytes, shards, local_image_dir, image_dir, shard_workers)
+            else:
+                if ocr:
+                    print("检测为OCR类型PDF，使用OCR模式处理...")
+                    # 分析模型在每个进程中只加载一次，之后的文档直接复用
+                    get_model_manager().ensure_loaded(ocr=True)
+                    infer_result = ds.apply(doc_analyze, ocr=True)
+                    pipe_result = infer_result.pipe_ocr_mode(image_writer)
+                else:
+                    print("检测为文本类型PDF，使用文本模式处理...")
+                    get_model_manager().ensure_loaded(ocr=False)
+                    infer_result = ds.apply(doc_analyze, ocr=False)
+                    pipe_result = infer_result.pipe_txt_mode(image_writer)
+
+                # 生成并保存Markdown
+                print("生成Markdown文档...")
+                pipe_result.dump_md(md_writer, f"{name_without_suff}.md", image_dir)
+                pipe_result.dump_content_list(md_writer, f"{name_without_suff}_content_list.json", image_dir)
+                pipe_result.dump_middle_json(md_writer, f"{name_without_suff}_middle.json")
+        
+        if extracted is not None:
+            md_content, content_list, middle_json = extracted
+            print("生成Markdown文档...")
+            md_writer.write_string(f"{name_without_suff}.md", md_content)
+            md_writer.write_string(f"{name_without_suff}_content_list.json",
+                                   json.dumps(content_list, ensure_ascii=False, indent=4))
+            md_writer.write_string(f"{name_without_suff}_middle.json",
+                                   json.dumps(middle_json, ensure_ascii=False, indent=4))
+        
+        if cache_key is not None:
+            try:
+                cache.store(cache_key, md_path, local_image_dir, content_list_path, middle_json_path)
+            except OSError as e:
+                print(f"转换结果写入缓存失败: {e}")
         
         print("\n处理完成! Markdown文件已保存:")
         print(f"Markdown文档: {md_path}")
@@ -68,7 +158,10 @@ def pdf_to_markdown(pdf_file_path, output_base_dir="output"):
         return {
             "status": "success",
             "markdown": md_path,
-            "output_dir": os.path.abspath(output_base_dir)
+            "output_dir": os.path.abspath(output_base_dir),
+            "content_list": content_list_path,
+            "middle_json": middle_json_path,
+            "cached": False
         }
         
     except Exception as e:
@@ -86,10 +179,18 @@ def main():
     parser = argparse.ArgumentParser(description="将PDF文件转换为Markdown格式")
     parser.add_argument("pdf_path", help="PDF文件的路径")
     parser.add_argument("-o", "--output", default="output", help="输出目录路径，默认为'output'")
+    parser.add_argument("--shard-pages", type=int, default=None, help="分片页数，页数超过该值的PDF分片并行解析")
+    parser.add_argument("--workers", type=int, default=None, help="并行解析分片的进程数，为1时不分片")
+    parser.add_argument("--cache-dir", default=None, help="转换结果缓存目录，同一份PDF再次转换时直接复用结果")
+    parser.add_argument("--no-hybrid-ocr", action="store_true", help="不按页选择解析模式，整份文档统一使用文本或OCR模式")
+    parser.add_argument("--pdf-engine", choices=["auto", "mineru", "fast"], default="auto",
+                        help="解析引擎：auto 自动选择，mineru 使用MinerU模型，fast 直接用PyMuPDF提取文本层")
     
     args = parser.parse_args()
     
-    result = pdf_to_markdown(args.pdf_path, args.output)
+    cache = get_conversion_cache(args.cache_dir) if args.cache_dir else None
+    result = pdf_to_markdown(args.pdf_path, args.output, args.shard_pages, args.workers, cache,
+                         hybrid_ocr=not args.no_hybrid_ocr, engine=args.pdf_engine)
     
     if result["status"] == "success":
         print(f"\n转换成功! Markdown文件保存在: {result['markdown']}")
@@ -0,0 +1,291 @@
+"""
+按页分片解析PDF：将PDF拆分为若干页范围，每个分片可以使用不同的解析模式（文本/OCR），
+在进程池中并行分析（或在当前进程中依次分析），再按页序合并各分片的Markdown，
+并连接被分片边界截断的段落
+"""
+
+import atexit
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz
+from magic_pdf.data.data_reader_writer import FileBasedDataWriter
+from magic_pdf.data.dataset import PymuDocDataset
+from magic_pdf.model.doc_analyze_by_custom_model import doc_analyze
+
+from pdf_converter.model_manager import get_model_manager
+
+
+# 页数达到该值时才分片，每个分片的页数
+DEFAULT_SHARD_PAGES = 50
+# 默认的工作进程数；每个进程各自加载一份分析模型，内存（显存）占用随之成倍增加
+DEFAULT_SHARD_WORKERS = min(4, os.cpu_count() or 1)
+
+# 不能与下一行拼接的结构行：标题、列表、引用、表格、HTML、图片、公式、代码围栏
+_STRUCTURAL_LINE_RE = re.compile(r'^\s*(?:#|[-*+]\s|\d+[.)]\s|>|\||<|!\[|\$\$|```)')
+# 段落结束的标点
+_SENTENCE_END_RE = re.compile(r'[.!?。！？:：;；"”’)\]]\s*$')
+# 中日韩文字
+_CJK_CHAR_RE = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]')
+
+
+def shard_settings(shard_pages=None, workers=None):
+    """
+    补全分片参数的默认值
+
+    返回:
+        tuple: (每个分片的页数, 工作进程数)
+    """
+    return shard_pages or DEFAULT_SHARD_PAGES, workers or DEFAULT_SHARD_WORKERS
+
+
+def plan_shards(page_runs, shard_pages=None, workers=None):
+    """
+    计算分片：解析模式不同的页范围各自成为分片，多进程时再把超过分片页数的页范围
+    切分为页数尽量相等的几段，不会在末尾留下只有一两页的分片
+
+    参数:
+        page_runs: [(起始页, 结束页, 是否OCR)] 列表（结束页不含），覆盖整份文档
+        shard_pages: 每个分片的页数，默认为DEFAULT_SHARD_PAGES
+        workers: 工作进程数，默认为DEFAULT_SHARD_WORKERS
+
+    返回:
+        list: [(起始页, 结束页, 是否OCR)] 列表，整份文档作为一个分片处理即可时返回None
+    """
+    shard_pages, workers = shard_settings(shard_pages, workers)
+    if workers <= 1:
+        shards = list(page_runs)
+    else:
+        shards = []
+        for run_start, run_end, ocr in page_runs:
+            pieces = max(1, -(-(run_end - run_start) // shard_pages))
+            bounds = [run_start + (run_end - run_start) * i // pieces for i in range(pieces + 1)]
+            shards.extend((start, end, ocr) for start, end in zip(bounds, bounds[1:]))
+    return shards if len(shards) > 1 else None
+
+
+def _extract_pages(pdf_bytes, start, end):
+    """
+    用PyMuPDF截取PDF的一段页面
+
+    返回:
+        bytes: 只包含[start, end)页的PDF
+    """
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc, fitz.open() as shard:
+        shard.insert_pdf(doc, from_page=start, to_page=end - 1)
+        return shard.tobytes()
+
+
+# 进程池在第一次分片解析时创建，之后的文档共用，工作进程中的模型只加载一次
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    """工作进程初始化：预先加载文本模式的分析模型，OCR模型在第一次遇到扫描页时加载，之后一直保留"""
+    get_model_manager().ensure_loaded(ocr=False)
+
+
+def get_shard_pool(workers):
+    """
+    获取共用的分片解析进程池，第一次调用时创建
+    进程池的大小在创建时确定，之后传入不同的workers也沿用已有的进程池，
+    避免其他正在进行的解析被中断；需要调整大小时先调用shutdown_shard_pool
+
+    参数:
+        workers: 工作进程数
+
+    返回:
+        ProcessPoolExecutor: 进程池
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 使用spawn启动工作进程，避免fork后继承父进程中的CUDA上下文
+            context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker)
+            print(f"分片解析进程池已创建: {workers} 个工作进程")
+        return _pool
+
+
+def shutdown_shard_pool(wait=True):
+    """
+    关闭共用的分片解析进程池，释放工作进程及其中加载的模型；进程退出时会自动调用
+
+    参数:
+        wait: 是否等待正在进行的分片完成
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
+
+atexit.register(shutdown_shard_pool)
+
+
+def _analyze_shard(shard_bytes, ocr, local_image_dir, image_dir):
+    """
+    在工作进程中分析一个分片
+
+    参数:
+        shard_bytes: 分片PDF的字节内容
+        ocr: 是否使用OCR模式
+        local_image_dir: 分片图片的保存目录
+        image_dir: Markdown中引用该目录时使用的相对路径
+
+    返回:
+        tuple: (Markdown文本, 内容列表, 中间处理结果)
+    """
+    os.makedirs(local_image_dir, exist_ok=True)
+    image_writer = FileBasedDataWriter(local_image_dir)
+
+    get_model_manager().ensure_loaded(ocr=ocr)
+    ds = PymuDocDataset(shard_bytes)
+    infer_result = ds.apply(doc_analyze, ocr=ocr)
+    if ocr:
+        pipe_result = infer_result.pipe_ocr_mode(image_writer)
+    else:
+        pipe_result = infer_result.pipe_txt_mode(image_writer)
+    return (pipe_result.get_markdown(image_dir),
+            pipe_result.get_content_list(image_dir),
+            json.loads(pipe_result.get_middle_json()))
+
+
+def _continues_paragraph(last_line, first_line):
+    """判断上一分片的最后一行与下一分片的第一行是否属于同一个段落"""
+    if not last_line.strip() or not first_line.strip():
+        return False
+    if _STRUCTURAL_LINE_RE.match(last_line) or _STRUCTURAL_LINE_RE.match(first_line):
+        return False
+    if _SENTENCE_END_RE.search(last_line):
+        return False
+    first_char = first_line.lstrip()[0]
+    return first_char.islower() or bool(_CJK_CHAR_RE.match(first_char)) or last_line.rstrip().endswith('-')
+
+
+def join_lines(last_line, first_line):
+    """拼接被分片边界截断的一行：连字符断词直接相连，中日韩文字之间不加空格，其余补一个空格"""
+    left = last_line.rstrip()
+    right = first_line.lstrip()
+    if left.endswith('-') and right[:1].islower():
+        return left[:-1] + right
+    if _CJK_CHAR_RE.match(left[-1]) and _CJK_CHAR_RE.match(right[0]):
+        return left + right
+    return f"{left} {right}"
+
+
+def merge_shard_markdown(parts):
+    """
+    按页序合并各分片的Markdown，分片边界处被截断的段落重新连接
+
+    参数:
+        parts: 按页序排列的分片Markdown文本
+
+    返回:
+        str: 合并后的Markdown文本
+    """
+    merged = ""
+    for part in parts:
+        part = part.strip('\n')
+        if not part:
+            continue
+        if not merged:
+            merged = part
+            continue
+
+        head, _, last_line = merged.rpartition('\n')
+        first_line, _, tail = part.partition('\n')
+        if _continues_paragraph(last_line, first_line):
+            joined = join_lines(last_line, first_line)
+            merged = (head + '\n' if head else '') + joined + ('\n' + tail if tail else '')
+        else:
+            merged = merged + '\n\n' + part
+    return merged + '\n'
+
+
+def merge_shard_results(shards, content_lists, middle_jsons):
+    """
+    合并各分片的内容列表和中间处理结果，页码换算为在整份文档中的页码
+
+    参数:
+        shards: 各分片的页范围
+        content_lists: 各分片的内容列表
+        middle_jsons: 各分片的中间处理结果
+
+    返回:
+        tuple: (内容列表, 中间处理结果)
+    """
+    content_list = []
+    for (start, _, _), items in zip(shards, content_lists):
+        for item in items:
+            if 'page_idx' in item:
+                item = dict(item, page_idx=item['page_idx'] + start)
+            content_list.append(item)
+
+    middle_json = dict(middle_jsons[0]) if middle_jsons else {}
+    pdf_info = []
+    for (start, _, _), middle in zip(shards, middle_jsons):
+        for page in middle.get('pdf_info', []):
+            pdf_info.append(dict(page, page_idx=page.get('page_idx', 0) + start))
+    middle_json['pdf_info'] = pdf_info
+    return content_list, middle_json
+
+
+def parse_sharded(pdf_bytes, shards, local_image_dir, image_dir, workers=None):
+    """
+    分析各分片并合并结果；有多个工作进程时在进程池中并行分析，否则在当前进程中依次分析
+
+    参数:
+        pdf_bytes: PDF的字节内容
+        shards: plan_shards返回的分片列表
+        local_image_dir: 图片保存目录
+        image_dir: Markdown中引用图片目录时使用的相对路径
+        workers: 工作进程数
+
+    返回:
+        tuple: (合并后的Markdown文本, 内容列表, 中间处理结果)
+    """
+    workers = workers or DEFAULT_SHARD_WORKERS
+    ocr_pages = sum(end - start for start, end, ocr in shards if ocr)
+    print(f"分片解析: 共 {len(shards)} 个分片, {min(workers, len(shards))} 个工作进程, "
+          f"OCR {ocr_pages} 页, 文本 {shards[-1][1] - ocr_pages} 页")
+
+    # 各分片的图片放在以页范围命名的子目录中，不同分片中同名的图片不会互相覆盖
+    jobs = [
+        (start, end, ocr, os.path.join(local_image_dir, f"p{start + 1:04d}-{end:04d}"),
+         f"{image_dir}/p{start + 1:04d}-{end:04d}")
+        for start, end, ocr in shards
+    ]
+
+    results = []
+    if workers <= 1 or len(shards) == 1:
+        for start, end, ocr, shard_image_dir, shard_ref_dir in jobs:
+            results.append(_analyze_shard(_extract_pages(pdf_bytes, start, end), ocr,
+                                          shard_image_dir, shard_ref_dir))
+            print(f"分片完成: 第 {start + 1}-{end} 页 ({'OCR' if ocr else '文本'}模式)")
+    else:
+        executor = get_shard_pool(workers)
+        try:
+            futures = [
+                executor.submit(_analyze_shard, _extract_pages(pdf_bytes, start, end), ocr,
+                                shard_image_dir, shard_ref_dir)
+                for start, end, ocr, shard_image_dir, shard_ref_dir in jobs
+            ]
+            for (start, end, ocr, _, _), future in zip(jobs, futures):
+                results.append(future.result())
+                print(f"分片完成: 第 {start + 1}-{end} 页 ({'OCR' if ocr else '文本'}模式)")
+        except BrokenProcessPool:
+            # 工作进程异常退出（如显存不足被杀死）后进程池不可再用，丢弃它，下一个文档重新创建
+            shutdown_shard_pool(wait=False)
+            raise
+
+    parts, content_lists, middle_jsons = zip(*results)
+    content_list, middle_json = merge_shard_results(shards, content_lists, middle_jsons)
+    return merge_shard_markdown(parts), content_list, middle_json
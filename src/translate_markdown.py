@@ -7,14 +7,111 @@
 
 import os
 import sys
+import glob
+import json
+import time
 import argparse
-import re # Import the re module
-from translation_api import BaiduTranslationAPI
+from concurrent.futures import ThreadPoolExecutor
+from translation_api import BaiduTranslationAPI, BAIDU_TIER_QPS
+from translation.transport import HTTPTransport, CircuitBreaker
+from translation.translation_cache import TranslationCache, CachedTranslationAPI
+from translation.rate_limiter import AdaptiveRateLimiter
+from translation.key_pool import KeyPoolTranslationAPI
+from translation.manifest import TranslationManifest, manifest_path_for
+from translation.journal import TranslationJournal, JournaledTranslationAPI, journal_path_for
+from translation.planner import DryRunTranslationAPI, estimate_duration, format_plan
+from translation.glossary import load_glossary
 from markdown_translator import MarkdownTranslator
 import config
 
 
-def process_translation(input_file, output_file=None, from_lang=None, to_lang=None, app_id=None, app_key=None):
+def unique_credentials(app_id, app_key, extra_keys=None):
+    """
+    合并主密钥和额外的密钥，按APP ID去重（QPS配额按APP ID计算），主密钥在最前
+    
+    :param app_id: 百度翻译APP ID
+    :param app_key: 百度翻译密钥
+    :param extra_keys: 额外的 (APP ID, 密钥) 列表 (可选)
+    :return: {APP ID: 密钥}，保持顺序，同一APP ID取第一次出现的密钥
+    """
+    credentials = {}
+    for key_id, key_secret in [(app_id, app_key)] + [tuple(key) for key in (extra_keys or [])]:
+        credentials.setdefault(key_id, key_secret)
+    return credentials
+
+
+def create_translator(app_id, app_key, extra_keys=None):
+    """
+    按配置创建百度翻译API实例，提供多组密钥时组成密钥池
+    
+    :param app_id: 百度翻译APP ID
+    :param app_key: 百度翻译密钥
+    :param extra_keys: 额外的 (APP ID, 密钥) 列表 (可选)
+    :return: TranslationAPI实例
+    """
+    # 网络请求经由带连接池、重试和熔断的传输层发出，所有密钥共享同一个连接池
+    transport = HTTPTransport(
+        pool_size=config.TRANSLATION_POOL_SIZE,
+        connect_timeout=config.TRANSLATION_CONNECT_TIMEOUT,
+        read_timeout=config.TRANSLATION_READ_TIMEOUT,
+        max_retries=config.TRANSLATION_MAX_RETRIES,
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=config.TRANSLATION_CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=config.TRANSLATION_CIRCUIT_RECOVERY_TIMEOUT
+        )
+    )
+    
+    # 去掉重复的密钥，保持主密钥在最前
+    credentials = unique_credentials(app_id, app_key, extra_keys)
+    
+    # QPS配额按APP ID计算，每个密钥使用独立的限流器，被限流时自动降速并重试
+    translators = {
+        key_id: BaiduTranslationAPI(
+            app_id=key_id, app_key=key_secret, transport=transport,
+            rate_limiter=AdaptiveRateLimiter(BAIDU_TIER_QPS[config.BAIDU_ACCOUNT_TIER])
+        )
+        for key_id, key_secret in credentials.items()
+    }
+    if len(translators) == 1:
+        return translators[app_id]
+    
+    print(f"使用密钥池翻译，共 {len(translators)} 组密钥")
+    return KeyPoolTranslationAPI(translators, strategy=config.BAIDU_KEY_POOL_STRATEGY)
+
+
+def create_translation_cache(cache_path=None):
+    """
+    按配置创建翻译缓存
+    
+    :param cache_path: 缓存数据库路径 (可选)，默认使用config中的路径
+    :return: TranslationCache实例
+    """
+    ttl_days = config.TRANSLATION_CACHE_TTL_DAYS
+    return TranslationCache(
+        cache_path or config.TRANSLATION_CACHE_PATH,
+        max_entries=config.TRANSLATION_CACHE_MAX_ENTRIES,
+        ttl=ttl_days * 24 * 3600 if ttl_days is not None else None
+    )
+
+
+def create_glossary(glossary_path=None):
+    """
+    按配置加载术语表
+    
+    :param glossary_path: 术语表文件路径 (可选)，默认使用config中的路径
+    :return: Glossary实例，未配置术语表时返回None
+    """
+    glossary_path = glossary_path or config.TRANSLATION_GLOSSARY_PATH
+    if not glossary_path:
+        return None
+    glossary = load_glossary(glossary_path, case_sensitive=config.TRANSLATION_GLOSSARY_CASE_SENSITIVE)
+    print(f"已加载术语表: {glossary_path}，共 {len(glossary)} 个术语")
+    return glossary
+
+
+def process_translation(input_file, output_file=None, from_lang=None, to_lang=None, app_id=None, app_key=None,
+                        use_cache=True, cache_path=None, extra_keys=None, max_workers=None, streaming=None,
+                        incremental=True, translator=None, cache=None, glossary=None):
     """
     翻译指定的Markdown文件
     
@@ -24,6 +121,15 @@ def process_translation(input_file, output_file=None, from_lang=None, to_lang=No
     :param to_lang: 目标语言 (可选)
     :param app_id: 百度翻译APP ID
     :param app_key: 百度翻译密钥
+    :param use_cache: 是否启用翻译缓存，已翻译过的片段直接从缓存读取
+    :param cache_path: 翻译缓存数据库路径 (可选)
+    :param extra_keys: 额外的 (APP ID, 密钥) 列表，与主密钥组成密钥池 (可选)，默认使用config中的配置
+    :param max_workers: 并行翻译的线程数 (可选)，默认使用config中的配置
+    :param streaming: 是否流式翻译 (可选)，默认在文件超过config中的阈值时自动启用
+    :param incremental: 是否增量翻译，启用时读取译文旁的清单，只翻译新增或修改过的块
+    :param translator: 共享的翻译API实例 (可选)，批量翻译时多个文件共用连接池和限流器，给出时忽略密钥参数
+    :param cache: 共享的翻译缓存 (可选)，由调用方负责关闭；未给出时按use_cache自行创建
+    :param glossary: 术语表 (可选)，默认按config中的路径加载
     """
     # 检查输入文件是否存在
     if not os.path.exists(input_file):
@@ -38,56 +144,81 @@ def process_translation(input_file, output_file=None, from_lang=None, to_lang=No
     print(f"开始翻译Markdown文件: {input_file}")
     print(f"翻译结果将保存到: {output_file}")
     
-    # 读取文件内容
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 定义HTML表格的正则表达式和占位符
-    html_table_pattern = re.compile(r'<html>.*?</table>', re.DOTALL)
-    placeholder_prefix = "HTML_TABLE_PLACEHOLDER_"
-    
-    # 查找所有HTML表格并替换为占位符
-    tables = html_table_pattern.findall(content)
-    content_with_placeholders = content
-    placeholders_map = {}
-    for i, table in enumerate(tables):
-        placeholder = f"{placeholder_prefix}{i}__"
-        content_with_placeholders = content_with_placeholders.replace(table, placeholder, 1)
-        placeholders_map[placeholder] = table
-
     # 获取翻译参数
     source_lang = from_lang or config.SOURCE_LANG
     target_lang = to_lang or config.TARGET_LANG
     
-    # 检查API密钥是否提供
-    if not app_id or not app_key:
-        error_msg = "错误：必须提供百度翻译API的APP ID和密钥"
-        print(error_msg)
-        return None, error_msg
+    if translator is None:
+        # 检查API密钥是否提供
+        if not app_id or not app_key:
+            error_msg = "错误：必须提供百度翻译API的APP ID和密钥"
+            print(error_msg)
+            return None, error_msg
+        
+        # 创建翻译API实例
+        if extra_keys is None:
+            extra_keys = config.BAIDU_TRANSLATE_EXTRA_KEYS
+        translator = create_translator(app_id, app_key, extra_keys)
+    
+    # 启用翻译缓存，重复出现的片段不再重复计费
+    owns_cache = cache is None and use_cache
+    if owns_cache:
+        cache = create_translation_cache(cache_path)
+    if cache:
+        translator = CachedTranslationAPI(translator, cache)
     
-    # 创建翻译API实例
-    translator = BaiduTranslationAPI(app_id=app_id, app_key=app_key)
+    # 断点日志：已完成的片段逐批写入日志，任务中断后重新运行时从断点继续
+    journal = TranslationJournal(journal_path_for(output_file), source_lang, target_lang)
+    if journal.resumed:
+        print(f"发现未完成的翻译任务，从断点继续: 已完成 {journal.resumed} 个片段")
+    translator = JournaledTranslationAPI(translator, journal, config.TRANSLATION_JOURNAL_CHECKPOINT_CHARS)
     
-    # 创建Markdown翻译器
+    if glossary is None:
+        glossary = create_glossary()
+    
+    # 创建Markdown翻译器，代码块、数学公式、术语和HTML表格的标记由占位符保护，表格单元格文本与正文一起批量翻译
     md_translator = MarkdownTranslator(
         translator=translator,
         source_lang=source_lang,
-        target_lang=target_lang
+        target_lang=target_lang,
+        max_workers=max_workers or config.TRANSLATION_MAX_WORKERS,
+        glossary=glossary
     )
     
+    # 增量翻译清单：源文件修订后重新翻译时，未改动的块直接复用上一次的译文
+    manifest = None
+    if incremental:
+        manifest = TranslationManifest(manifest_path_for(output_file), source_lang, target_lang,
+                                       glossary.fingerprint if glossary else None)
+    
     # 调用翻译函数进行翻译
     try:
-        # 翻译包含占位符的Markdown内容
-        result_with_placeholders = md_translator.translate_markdown(content_with_placeholders)
+        if streaming is None:
+            streaming = os.path.getsize(input_file) > config.TRANSLATION_STREAMING_THRESHOLD
         
-        # 将占位符替换回原始HTML表格内容
-        translated_result = result_with_placeholders
-        for placeholder, original_table in placeholders_map.items():
-            translated_result = translated_result.replace(placeholder, original_table, 1)
-
-        # 保存翻译结果
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(translated_result)
+        if streaming:
+            # 大文件逐个窗口翻译并写入，内存占用有上限，中途即可看到部分结果
+            print("文件较大，使用流式翻译")
+            md_translator.translate_stream(input_file, output_file, config.TRANSLATION_STREAMING_WINDOW_CHARS,
+                                          manifest)
+        else:
+            # 读取文件内容
+            with open(input_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            translated_result = md_translator.translate_markdown(content, manifest)
+            
+            # 保存翻译结果
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(translated_result)
+        
+        if manifest:
+            manifest.save()
+            stats = manifest.stats()
+            print(f"增量翻译: 复用 {stats['reused']} 个块, 翻译 {stats['translated']} 个块")
+        
+        # 翻译全部完成后断点日志不再需要
+        journal.discard()
         
         print(f"翻译完成！结果已保存到: {output_file}")
         return output_file, None
@@ -95,18 +226,314 @@ def process_translation(input_file, output_file=None, from_lang=None, to_lang=No
     except Exception as e:
         error_msg = f"翻译过程中出错: {e}"
         print(error_msg)
+        if journal.completed:
+            print(f"已完成的 {journal.completed} 个片段保存在断点日志中，重新运行即可从断点继续")
+        return None, error_msg
+    finally:
+        journal.close()
+        if manifest:
+            manifest.close()
+        if owns_cache:
+            stats = cache.stats()
+            print(f"翻译缓存: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, 共 {stats['entries']} 条")
+            cache.close()
+
+def plan_translation(input_file, output_file=None, from_lang=None, to_lang=None, extra_keys=None,
+                     max_workers=None, incremental=True, glossary=None, app_id=None, app_key=None):
+    """
+    翻译预演：执行与正式翻译相同的保护、分段、去重和分批逻辑，但不调用翻译服务，
+    用于在批量任务开始前估算额度消耗和耗时
+    
+    :param input_file: 输入的Markdown文件路径
+    :param output_file: 输出文件路径 (可选)，用于查找增量翻译清单
+    :param from_lang: 源语言 (可选)，默认使用config中的配置
+    :param to_lang: 目标语言 (可选)，默认使用config中的配置
+    :param extra_keys: 额外的 (APP ID, 密钥) 列表 (可选)，用于计算密钥池的总QPS
+    :param max_workers: 并行翻译的线程数 (可选)，影响片段分组方式
+    :param incremental: 是否计入增量翻译清单中可以复用的块
+    :param glossary: 术语表 (可选)，默认按config中的路径加载
+    :param app_id: 百度翻译APP ID (可选)，默认使用config中的配置，与extra_keys一起去重后得到密钥数
+    :param app_key: 百度翻译密钥 (可选)，默认使用config中的配置
+    :return: (预演结果字典, 错误信息)
+    """
+    if not os.path.exists(input_file):
+        print(f"错误：输入文件 {input_file} 不存在")
+        return None, "输入文件不存在"
+    
+    if not output_file:
+        name, ext = os.path.splitext(input_file)
+        output_file = f"{name}_translated{ext}"
+    
+    source_lang = from_lang or config.SOURCE_LANG
+    target_lang = to_lang or config.TARGET_LANG
+    
+    if glossary is None:
+        glossary = create_glossary()
+    
+    # 密钥数与正式翻译时create_translator去重后的结果一致，密钥池把每批片段分给各密钥
+    if extra_keys is None:
+        extra_keys = config.BAIDU_TRANSLATE_EXTRA_KEYS
+    key_count = len(unique_credentials(app_id or config.BAIDU_TRANSLATE_APP_ID,
+                                       app_key or config.BAIDU_TRANSLATE_APP_KEY, extra_keys))
+    translator = DryRunTranslationAPI(checkpoint_chars=config.TRANSLATION_JOURNAL_CHECKPOINT_CHARS,
+                                      key_count=key_count)
+    md_translator = MarkdownTranslator(
+        translator=translator,
+        source_lang=source_lang,
+        target_lang=target_lang,
+        max_workers=max_workers or config.TRANSLATION_MAX_WORKERS,
+        glossary=glossary
+    )
+    
+    # 清单只读取不保存，预演不会改变下一次正式翻译的行为
+    manifest = None
+    if incremental:
+        manifest = TranslationManifest(manifest_path_for(output_file), source_lang, target_lang,
+                                       glossary.fingerprint if glossary else None)
+    
+    with open(input_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    try:
+        md_translator.translate_markdown(content, manifest)
+    finally:
+        if manifest:
+            manifest.close()
+    
+    # 每组密钥各有独立的QPS配额，各密钥并行发送，耗时取决于分到请求最多的密钥
+    key_qps = BAIDU_TIER_QPS[config.BAIDU_ACCOUNT_TIER]
+    
+    plan = {
+        "input_file": input_file,
+        "segments": md_translator.dedup_stats.get("fragments", 0),
+        "unique_segments": md_translator.dedup_stats.get("unique", 0),
+        "skipped_segments": md_translator.skip_stats.get("saved_requests", 0),
+        "reused_blocks": manifest.reused if manifest else 0,
+        "request_segments": translator.segments,
+        "characters": translator.characters,
+        "requests": translator.requests,
+        "keys": key_count,
+        "qps": key_qps * key_count,
+        "estimated_seconds": estimate_duration(translator.busiest_key_requests, key_qps),
+    }
+    return plan, None
+
+
+def collect_markdown_files(pattern):
+    """
+    收集批量翻译的输入文件
+    
+    :param pattern: 目录（递归查找其中的.md文件）或glob模式（支持**）
+    :return: (文件路径列表, 计算相对路径所用的根目录)
+    """
+    if os.path.isdir(pattern):
+        root = pattern
+        files = glob.glob(os.path.join(glob.escape(pattern), '**', '*.md'), recursive=True)
+    else:
+        files = glob.glob(pattern, recursive=True)
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]) if files else '.'
+    
+    # 已有的译文不再作为输入
+    files = [f for f in files if os.path.isfile(f) and not os.path.splitext(f)[0].endswith('_translated')]
+    return sorted(files), root
+
+
+def batch_output_path(input_file, root, output_dir=None):
+    """
+    计算批量翻译中单个文件的输出路径
+    
+    :param input_file: 输入文件路径
+    :param root: 输入文件的根目录
+    :param output_dir: 输出目录 (可选)，给出时按相对于根目录的路径存放，否则与输入文件放在一起
+    :return: 输出文件路径
+    """
+    name, ext = os.path.splitext(input_file)
+    if not output_dir:
+        return f"{name}_translated{ext}"
+    relative = os.path.relpath(os.path.abspath(name), os.path.abspath(root))
+    return os.path.join(output_dir, f"{relative}_translated{ext}")
+
+
+def is_up_to_date(input_file, output_file):
+    """
+    判断译文是否比原文新，且没有未完成的断点日志
+    
+    :param input_file: 输入文件路径
+    :param output_file: 输出文件路径
+    :return: 是否可以跳过
+    """
+    if not os.path.exists(output_file) or os.path.exists(journal_path_for(output_file)):
+        return False
+    return os.path.getmtime(output_file) >= os.path.getmtime(input_file)
+
+
+def process_batch(pattern, output_dir=None, from_lang=None, to_lang=None, app_id=None, app_key=None,
+                  use_cache=True, cache_path=None, extra_keys=None, max_workers=None, file_workers=None,
+                  force=False, incremental=True, report_path=None, glossary=None):
+    """
+    批量翻译目录或glob模式匹配的所有Markdown文件
+    所有文件共用一个翻译API实例（连接池、限流器、密钥池）和一个翻译缓存，多个文件同时翻译
+    
+    :param pattern: 目录或glob模式
+    :param output_dir: 输出目录 (可选)，默认将译文放在原文旁边
+    :param from_lang: 源语言 (可选)
+    :param to_lang: 目标语言 (可选)
+    :param app_id: 百度翻译APP ID
+    :param app_key: 百度翻译密钥
+    :param use_cache: 是否启用翻译缓存
+    :param cache_path: 翻译缓存数据库路径 (可选)
+    :param extra_keys: 额外的 (APP ID, 密钥) 列表 (可选)
+    :param max_workers: 每个文件内并行翻译的线程数 (可选)
+    :param file_workers: 同时翻译的文件数 (可选)，默认使用config中的配置
+    :param force: 是否重新翻译已是最新的文件
+    :param incremental: 是否使用增量翻译清单
+    :param report_path: 汇总报告路径 (可选)，默认为输出目录（或当前目录）下的translation_report.json
+    :param glossary: 术语表 (可选)，默认按config中的路径加载，所有文件共用
+    :return: (汇总报告字典, 错误信息)
+    """
+    files, root = collect_markdown_files(pattern)
+    if not files:
+        error_msg = f"没有找到需要翻译的Markdown文件: {pattern}"
+        print(error_msg)
         return None, error_msg
+    
+    if not app_id or not app_key:
+        error_msg = "错误：必须提供百度翻译API的APP ID和密钥"
+        print(error_msg)
+        return None, error_msg
+    
+    if extra_keys is None:
+        extra_keys = config.BAIDU_TRANSLATE_EXTRA_KEYS
+    translator = create_translator(app_id, app_key, extra_keys)
+    cache = create_translation_cache(cache_path) if use_cache else None
+    if glossary is None:
+        glossary = create_glossary()
+    
+    def translate_one(input_file):
+        output_file = batch_output_path(input_file, root, output_dir)
+        if not force and is_up_to_date(input_file, output_file):
+            return {"input": input_file, "output": output_file, "status": "skipped", "seconds": 0.0}
+        
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        start = time.perf_counter()
+        result, error = process_translation(
+            input_file, output_file, from_lang, to_lang,
+            max_workers=max_workers, incremental=incremental,
+            translator=translator, cache=cache, glossary=glossary
+        )
+        return {
+            "input": input_file,
+            "output": output_file,
+            "status": "failed" if error else "translated",
+            "seconds": round(time.perf_counter() - start, 3),
+            "error": error,
+        }
+    
+    print(f"批量翻译: 共 {len(files)} 个文件")
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=file_workers or config.TRANSLATION_FILE_WORKERS) as executor:
+            results = list(executor.map(translate_one, files))
+    finally:
+        if cache:
+            cache.close()
+    
+    report = {
+        "total": len(results),
+        "translated": sum(1 for r in results if r["status"] == "translated"),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "seconds": round(time.perf_counter() - start, 3),
+        "files": results,
+    }
+    
+    report_path = report_path or os.path.join(output_dir or '.', 'translation_report.json')
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    
+    print(f"批量翻译完成: 翻译 {report['translated']} 个, 跳过 {report['skipped']} 个, "
+          f"失败 {report['failed']} 个, 用时 {report['seconds']:.1f} 秒")
+    for r in results:
+        if r["status"] == "failed":
+            print(f"  失败: {r['input']}: {r['error']}")
+    print(f"汇总报告已保存到: {report_path}")
+    return report, None
+
 
 def main():
     """测试翻译Markdown文件的主函数"""
     # 解析命令行参数
     parser = argparse.ArgumentParser(description="Markdown文件翻译工具")
-    parser.add_argument("input_file", help="输入的Markdown文件路径")
-    parser.add_argument("-o", "--output", help="输出的翻译结果文件路径")
+    parser.add_argument("input_file", help="输入的Markdown文件路径，也可以是目录或glob模式（如 'docs/**/*.md'）以批量翻译")
+    parser.add_argument("-o", "--output", help="输出的翻译结果文件路径，批量翻译时为输出目录")
     parser.add_argument("--from-lang", help="源语言，默认为英语(en)")
     parser.add_argument("--to-lang", help="目标语言，默认为中文(zh)")
+    parser.add_argument("--no-cache", action="store_true", help="如果设置，将不使用翻译缓存")
+    parser.add_argument("--full", action="store_true", help="如果设置，将忽略增量翻译清单，重新翻译全文")
+    parser.add_argument("--dry-run", action="store_true", help="如果设置，只统计片段数、字符数、请求数和预计耗时，不调用翻译服务")
+    parser.add_argument("--workers", type=int, help=f"并行翻译的线程数，默认为{config.TRANSLATION_MAX_WORKERS}")
+    parser.add_argument("--glossary", help="术语表文件路径（JSON或制表符分隔的文本），默认使用config中的配置")
+    parser.add_argument("--jobs", type=int, help=f"批量翻译时同时翻译的文件数，默认为{config.TRANSLATION_FILE_WORKERS}")
+    parser.add_argument("--force", action="store_true", help="批量翻译时，如果设置，将重新翻译已是最新的文件")
+    parser.add_argument("--report", help="批量翻译汇总报告的保存路径，默认为输出目录下的translation_report.json")
     
     args = parser.parse_args()
+    glossary = create_glossary(args.glossary) if args.glossary else None
+    
+    # 输入为目录或glob模式时进入批量模式；已存在的文件总是单独翻译，文件名中可能含有[等字符
+    if os.path.isfile(args.input_file):
+        batch_mode = False
+    else:
+        batch_mode = os.path.isdir(args.input_file) or (
+            not os.path.exists(args.input_file) and any(c in args.input_file for c in '*?['))
+    
+    if batch_mode and args.dry_run:
+        files, root = collect_markdown_files(args.input_file)
+        for input_file in files:
+            plan, error = plan_translation(
+                input_file,
+                batch_output_path(input_file, root, args.output),
+                args.from_lang,
+                args.to_lang,
+                max_workers=args.workers,
+                incremental=not args.full,
+                glossary=glossary
+            )
+            if plan:
+                print(format_plan(plan))
+        return
+    
+    if batch_mode:
+        process_batch(
+            args.input_file,
+            args.output,
+            args.from_lang,
+            args.to_lang,
+            config.BAIDU_TRANSLATE_APP_ID,
+            config.BAIDU_TRANSLATE_APP_KEY,
+            use_cache=not args.no_cache,
+            max_workers=args.workers,
+            file_workers=args.jobs,
+            force=args.force,
+            incremental=not args.full,
+            report_path=args.report,
+            glossary=glossary
+        )
+        return
+    
+    if args.dry_run:
+        plan, error = plan_translation(
+            args.input_file,
+            args.output,
+            args.from_lang,
+            args.to_lang,
+            max_workers=args.workers,
+            incremental=not args.full,
+            glossary=glossary
+        )
+        if plan:
+            print(format_plan(plan))
+        return
     
     # 注意：从命令行独立运行时，你需要确保config.py中有密钥，或通过其他方式传入
     process_translation(
@@ -115,7 +542,11 @@ def main():
         args.from_lang, 
         args.to_lang,
         config.BAIDU_TRANSLATE_APP_ID,
-        config.BAIDU_TRANSLATE_APP_KEY
+        config.BAIDU_TRANSLATE_APP_KEY,
+        use_cache=not args.no_cache,
+        max_workers=args.workers,
+        incremental=not args.full,
+        glossary=glossary
     )
 
 
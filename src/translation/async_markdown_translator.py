@@ -0,0 +1,52 @@
+from markdown_translator import MarkdownTranslator
+from translation.async_translation_api import AsyncTranslationAPI
+
+
+class AsyncMarkdownTranslator:
+    """
+    异步Markdown翻译器
+    先收集整篇文档中需要翻译的片段，交给异步翻译API并发翻译，再按文档顺序回填
+    """
+
+    def __init__(self, translator: AsyncTranslationAPI, source_lang: str, target_lang: str):
+        """
+        初始化异步Markdown翻译器
+        :param translator: 异步翻译API接口
+        :param source_lang: 源语言
+        :param target_lang: 目标语言
+        """
+        self.translator = translator
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        # 复用同步翻译器的解析与重组逻辑，它本身不发出任何请求
+        self.engine = MarkdownTranslator(None, source_lang, target_lang)
+
+    async def translate_file(self, input_file: str, output_file: str) -> None:
+        """
+        翻译整个Markdown文件
+        :param input_file: 输入文件路径
+        :param output_file: 输出文件路径
+        """
+        with open(input_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        translated_content = await self.translate_markdown(content)
+
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(translated_content)
+
+        print(f"翻译完成，已保存到 {output_file}")
+
+    async def translate_markdown(self, markdown_text: str) -> str:
+        """
+        翻译Markdown文本，保持原始布局
+        :param markdown_text: 原始Markdown文本
+        :return: 翻译后的Markdown文本
+        """
+        document = self.engine.parse_document(markdown_text)
+        unique = self.engine.skip_untranslatable(self.engine.unique_segments(document))
+
+        # 并发翻译所有片段，结果与输入顺序一致
+        translated = await self.translator.batch_translate(unique, self.source_lang, self.target_lang)
+
+        return self.engine.render_document(document, dict(zip(unique, translated)))
@@ -0,0 +1,91 @@
+import abc
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from translation_api import TranslationAPI
+
+
+class AsyncTranslationAPI(abc.ABC):
+    """异步翻译API的抽象基类，与TranslationAPI的接口一一对应"""
+
+    @abc.abstractmethod
+    async def translate(self, text: str, from_lang: str, to_lang: str) -> str:
+        """
+        翻译文本
+        :param text: 要翻译的文本
+        :param from_lang: 源语言
+        :param to_lang: 目标语言
+        :return: 翻译后的文本
+        """
+        pass
+
+    @abc.abstractmethod
+    async def batch_translate(self, texts: List[str], from_lang: str, to_lang: str) -> List[str]:
+        """
+        批量翻译文本，结果顺序与输入一致
+        :param texts: 要翻译的文本列表
+        :param from_lang: 源语言
+        :param to_lang: 目标语言
+        :return: 翻译后的文本列表
+        """
+        pass
+
+
+class ExecutorAsyncTranslationAPI(AsyncTranslationAPI):
+    """
+    将同步的TranslationAPI包装为异步接口的适配器
+    这不是原生的异步I/O：每个请求仍然是阻塞调用，只是转到线程池中执行，不占用事件循环，
+    并发能力受线程池大小限制；同时在途的请求数不超过max_concurrency
+    """
+
+    def __init__(self, translator: TranslationAPI, max_concurrency: int = 8, batch_size: int = 50,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        """
+        :param translator: 被包装的同步翻译API
+        :param max_concurrency: 同时在途的最大请求数
+        :param batch_size: 批量翻译时每个子批次包含的片段数
+        :param executor: 执行阻塞请求的线程池，默认新建一个与并发上限等大的线程池
+        """
+        self.translator = translator
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_concurrency)
+        # 信号量绑定到创建它时运行的事件循环，在第一次使用时于事件循环中创建，事件循环改变时重新创建
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    async def translate(self, text: str, from_lang: str = "en", to_lang: str = "zh") -> str:
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, self.translator.translate, text, from_lang, to_lang
+            )
+
+    async def batch_translate(self, texts: List[str], from_lang: str = "en", to_lang: str = "zh") -> List[str]:
+        # 拆成多个子批次并发发送，gather保证结果按子批次顺序返回
+        chunks = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(
+            *(self._translate_chunk(chunk, from_lang, to_lang) for chunk in chunks)
+        )
+        return [text for chunk_result in results for text in chunk_result]
+
+    async def _translate_chunk(self, texts: List[str], from_lang: str, to_lang: str) -> List[str]:
+        """在线程池中翻译一个子批次"""
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, self.translator.batch_translate, texts, from_lang, to_lang
+            )
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环中的并发信号量，只能在协程中调用"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def close(self) -> None:
+        """关闭线程池"""
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,35 @@
+"""
+翻译相关的异常类型
+"""
+
+
+class TranslationError(Exception):
+    """翻译失败的基础异常"""
+
+    def __init__(self, message: str, code=None):
+        """
+        :param message: 错误信息
+        :param code: 翻译服务返回的错误码或HTTP状态码（可选）
+        """
+        super().__init__(message)
+        self.code = code
+
+
+class TransientTranslationError(TranslationError):
+    """临时性错误（网络中断、超时、服务端5xx等），可以重试"""
+
+
+class RateLimitError(TransientTranslationError):
+    """请求频率超出服务商限制，稍后重试即可"""
+
+
+class CircuitOpenError(TranslationError):
+    """熔断器处于打开状态，翻译服务被判定为不可用，请求被直接拒绝"""
+
+
+class CredentialError(TranslationError):
+    """密钥无效、签名错误或未授权，换用其他密钥前不应再使用该密钥"""
+
+
+class QuotaExceededError(TranslationError):
+    """账户余额或字符额度已用尽"""
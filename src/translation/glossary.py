@@ -0,0 +1,205 @@
+"""
+术语表：用Aho-Corasick自动机一次扫描找出文本中的所有术语，
+替换为占位符后不再交给翻译API，还原时写回固定译名或术语原文
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# 术语表占位符
+GLOSSARY_PLACEHOLDER_PREFIX = "__GLOSSARY_"
+
+# 不应在其中替换术语的内联结构：行内代码、链接和图片的地址、HTML标签、已有的占位符
+_EXCLUDED_SPAN_RE = re.compile(
+    r'`[^`]+`|\]\([^)]+\)|<[^>]+>|__(?:CODE_BLOCK|MATH_BLOCK|MATH_INLINE|GLOSSARY)_\d+__|HTML_TABLE_PLACEHOLDER_\d+__'
+)
+
+
+def _is_word_char(ch: str) -> bool:
+    """ASCII字母、数字和下划线，术语两端紧邻这些字符时视为单词的一部分，不做匹配"""
+    return ch.isascii() and (ch.isalnum() or ch == '_')
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick多模式匹配自动机
+    构建一次后，对任意文本的扫描耗时与文本长度（加上匹配数）成正比，与模式数量无关
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        :param patterns: 模式串，空串会被忽略
+        """
+        self.patterns = [p for p in dict.fromkeys(patterns) if p]
+        self._goto = [{}]     # 每个状态的转移表
+        self._fail = [0]      # 失败指针
+        self._output = [[]]   # 到达该状态时匹配到的模式下标（含沿失败指针可达的模式）
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # 按层次遍历计算失败指针，并合并输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, int]]:
+        """
+        找出文本中所有模式的出现位置（可能重叠）
+        :param text: 要扫描的文本
+        :return: 依次产出 (起始位置, 结束位置, 模式下标)
+        """
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in output[state]:
+                yield pos + 1 - len(patterns[index]), pos + 1, index
+
+
+class Glossary:
+    """
+    术语表
+    每个术语对应一个固定译名；译名为空时术语原样保留（例如模型名、产品名）
+    """
+
+    def __init__(self, entries: Dict[str, Optional[str]], case_sensitive: bool = True):
+        """
+        :param entries: {术语: 固定译名}，译名为None或空串表示保留原文
+        :param case_sensitive: 是否区分大小写
+        """
+        self.case_sensitive = case_sensitive
+        self.entries = {}
+        for term, translation in entries.items():
+            term = term.strip()
+            if term:
+                key = term if case_sensitive else self._fold(term)
+                self.entries[key] = translation or None
+        self._automaton = AhoCorasick(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def fingerprint(self) -> str:
+        """术语表内容的摘要，术语表变化后已保存的译文不应再复用"""
+        data = json.dumps([self.case_sensitive, sorted(self.entries.items(), key=lambda item: item[0])],
+                          ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _fold(text: str) -> str:
+        """逐字符转为小写，保持长度不变，使匹配位置可以直接对应到原文"""
+        return ''.join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+    def find(self, text: str) -> List[Tuple[int, int]]:
+        """
+        找出文本中应当保护的术语，重叠时取最靠左、最长的一个；
+        术语两端不能紧邻字母数字，也不在行内代码、链接地址和HTML标签中
+        :param text: 要扫描的文本
+        :return: 按位置排列的 (起始位置, 结束位置) 列表
+        """
+        if not self.entries:
+            return []
+        haystack = text if self.case_sensitive else self._fold(text)
+
+        excluded = [match.span() for match in _EXCLUDED_SPAN_RE.finditer(text)]
+        candidates = []
+        for start, end, _ in self._automaton.iter_matches(haystack):
+            if start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1]):
+                continue
+            if end < len(text) and _is_word_char(text[end - 1]) and _is_word_char(text[end]):
+                continue
+            candidates.append((start, end))
+        candidates.sort(key=lambda span: (span[0], -span[1]))
+
+        spans = []
+        last_end = 0
+        excluded_index = 0
+        for start, end in candidates:
+            if start < last_end:
+                continue
+            while excluded_index < len(excluded) and excluded[excluded_index][1] <= start:
+                excluded_index += 1
+            if excluded_index < len(excluded) and excluded[excluded_index][0] < end:
+                continue
+            spans.append((start, end))
+            last_end = end
+        return spans
+
+    def protect(self, text: str, placeholders: Dict[str, str]) -> str:
+        """
+        将文本中的术语替换为占位符，同一术语共用一个占位符
+        可以对同一个占位符字典多次调用（如正文之后再逐个处理表格单元格），编号接着已有的术语占位符往下排
+        :param text: 已经保护过代码块、表格和公式的文本
+        :param placeholders: 占位符字典，新的占位符及其还原内容会加入其中
+        :return: 替换后的文本
+        """
+        spans = self.find(text)
+        if not spans:
+            return text
+
+        offset = sum(1 for placeholder in placeholders if placeholder.startswith(GLOSSARY_PLACEHOLDER_PREFIX))
+        by_term = {}
+        parts = []
+        pos = 0
+        for start, end in spans:
+            term = text[start:end]
+            placeholder = by_term.get(term)
+            if placeholder is None:
+                placeholder = f"{GLOSSARY_PLACEHOLDER_PREFIX}{offset + len(by_term)}__"
+                by_term[term] = placeholder
+                key = term if self.case_sensitive else self._fold(term)
+                placeholders[placeholder] = self.entries.get(key) or term
+            parts.append(text[pos:start])
+            parts.append(placeholder)
+            pos = end
+        parts.append(text[pos:])
+        return ''.join(parts)
+
+
+def load_glossary(path: str, case_sensitive: bool = True) -> Glossary:
+    """
+    从文件加载术语表
+    支持JSON对象 {"术语": "译名"}（译名为null时保留原文），
+    或每行一个术语的文本文件，术语与译名之间用制表符分隔，以#开头的行为注释
+    :param path: 术语表文件路径
+    :param case_sensitive: 是否区分大小写
+    :return: 术语表
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() == '.json':
+            entries = json.load(f)
+        else:
+            entries = {}
+            for line in f:
+                line = line.rstrip('\n')
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                term, _, translation = line.partition('\t')
+                entries[term] = translation.strip() or None
+    return Glossary(entries, case_sensitive=case_sensitive)
@@ -0,0 +1,55 @@
+"""
+HTML表格单元格拆分：把MinerU输出的表格拆成标签和单元格文本，
+单元格文本作为待翻译片段，标签和属性原样保留
+"""
+
+import re
+from typing import List, Tuple
+
+
+_TAG_RE = re.compile(r'<[^>]*>')
+# 单元格的开始和结束标签
+_CELL_TAG_RE = re.compile(r'<(/?)(?:td|th)\b', re.IGNORECASE)
+# 单元格中的行内公式不翻译
+_CELL_MATH_RE = re.compile(r'\$[^$]+?\$')
+
+
+def split_table_cells(html: str) -> List[Tuple[str, bool]]:
+    """
+    将HTML表格拆分为不需要翻译的标记和需要翻译的单元格文本
+    :param html: 表格的HTML源码
+    :return: (文本, 是否需要翻译) 列表，按顺序拼接即可还原表格
+    """
+    parts = []
+    depth = 0
+    pos = 0
+    for match in _TAG_RE.finditer(html):
+        _append_text(parts, html[pos:match.start()], depth > 0)
+        tag = match.group(0)
+        parts.append((tag, False))
+        cell_tag = _CELL_TAG_RE.match(tag)
+        if cell_tag:
+            depth = max(0, depth - 1) if cell_tag.group(1) else depth + 1
+        pos = match.end()
+    _append_text(parts, html[pos:], depth > 0)
+    return parts
+
+
+def _append_text(parts: List[Tuple[str, bool]], text: str, in_cell: bool) -> None:
+    """追加标签之间的文本，单元格内的非空文本需要翻译，其中的公式除外"""
+    if not text:
+        return
+    if not in_cell or not text.strip():
+        parts.append((text, False))
+        return
+
+    pos = 0
+    for match in _CELL_MATH_RE.finditer(text):
+        if match.start() > pos:
+            chunk = text[pos:match.start()]
+            parts.append((chunk, bool(chunk.strip())))
+        parts.append((match.group(0), False))
+        pos = match.end()
+    if pos < len(text):
+        chunk = text[pos:]
+        parts.append((chunk, bool(chunk.strip())))
@@ -0,0 +1,176 @@
+"""
+翻译断点日志：翻译过程中把已完成的片段逐批追加到JSONL文件，
+任务中断后重新运行同一任务时从日志恢复，只请求剩余的片段
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from translation_api import TranslationAPI
+
+
+def journal_path_for(output_file: str) -> str:
+    """
+    获取译文对应的断点日志路径，例如 paper_translated.md -> paper_translated.journal.jsonl
+    :param output_file: 译文文件路径
+    :return: 断点日志路径
+    """
+    return os.path.splitext(output_file)[0] + '.journal.jsonl'
+
+
+def iter_checkpoint_batches(texts: List[str], max_chars: int) -> Iterator[List[str]]:
+    """
+    将片段按字符数切分为若干检查点批次，保持原始顺序，超长的单个片段自成一批
+    :param texts: 片段列表
+    :param max_chars: 每个批次的字符数上限
+    :return: 依次产出的批次
+    """
+    batch = []
+    size = 0
+    for text in texts:
+        if batch and size + len(text) > max_chars:
+            yield batch
+            batch = []
+            size = 0
+        batch.append(text)
+        size += len(text)
+    if batch:
+        yield batch
+
+
+class TranslationJournal:
+    """
+    只追加写入的断点日志
+    第一行记录语言对，之后每行记录一个已完成的片段 {"s": 原文, "t": 译文}；
+    每批写入后立即刷新到磁盘，进程被杀死时最多丢失正在写入的最后一行
+    内存中只保留上次中断时已完成、本次尚未用到的片段，本次新完成的片段只写入磁盘，
+    流式翻译大文件时内存占用不随文档增长
+    """
+
+    def __init__(self, path: str, source_lang: str, target_lang: str):
+        """
+        :param path: 日志文件路径，文件已存在且语言对一致时读取其中的片段继续使用
+        :param source_lang: 源语言
+        :param target_lang: 目标语言
+        """
+        self.path = path
+        self.header = {"source_lang": source_lang, "target_lang": target_lang}
+        self._resumed_entries = self._load()
+        self.resumed = len(self._resumed_entries)
+        self.completed = self.resumed  # 日志中已完成的片段数（含上次中断前完成的）
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _load(self) -> Dict[str, str]:
+        """读取已有的日志，语言对不一致时忽略；被截断或损坏的行直接跳过"""
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = iter(f)
+            try:
+                header = json.loads(next(lines, ''))
+            except ValueError:
+                return entries
+            if header != self.header:
+                return entries
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                    entries[record['s']] = record['t']
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return entries
+
+    def _open(self) -> None:
+        """打开日志文件准备追加；没有可复用的内容时重新写入表头"""
+        if self._file is not None:
+            return
+        if self.resumed:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            # 上次中断时最后一行可能只写了一半，先补一个换行，使新记录从新的一行开始
+            self._file.write('\n')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write(json.dumps(self.header, ensure_ascii=False) + '\n')
+
+    def take(self, text: str) -> Optional[str]:
+        """
+        取出上次中断前已完成的片段译文，取出后不再保留在内存中
+        :param text: 片段原文
+        :return: 译文，日志中没有时返回None
+        """
+        with self._lock:
+            return self._resumed_entries.pop(text, None)
+
+    def append(self, items: Dict[str, str]) -> None:
+        """
+        追加一批已完成的片段并刷新到磁盘
+        :param items: {原文: 译文}
+        """
+        if not items:
+            return
+        with self._lock:
+            self._open()
+            self._file.write(''.join(
+                json.dumps({"s": text, "t": translation}, ensure_ascii=False) + '\n'
+                for text, translation in items.items()
+            ))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.completed += len(items)
+
+    def close(self) -> None:
+        """关闭日志文件，保留日志以便下次继续"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self) -> None:
+        """任务成功完成后关闭并删除日志"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class JournaledTranslationAPI(TranslationAPI):
+    """
+    为任意TranslationAPI加上断点日志的装饰器
+    日志中已有的片段直接返回；其余片段按字符数切分为若干检查点批次，
+    每完成一批就写入日志，中断时已完成的批次不会丢失
+    """
+
+    def __init__(self, translator: TranslationAPI, journal: TranslationJournal, checkpoint_chars: int = 12000):
+        """
+        :param translator: 被包装的翻译API
+        :param journal: 断点日志
+        :param checkpoint_chars: 每个检查点批次的字符数，越小中断时丢失的进度越少，但批量请求的合并效果越差
+        """
+        self.translator = translator
+        self.journal = journal
+        self.checkpoint_chars = checkpoint_chars
+        self.provider = getattr(translator, 'provider', type(translator).__name__)
+
+    def translate(self, text: str, from_lang: str = "en", to_lang: str = "zh") -> str:
+        return self.batch_translate([text], from_lang, to_lang)[0]
+
+    def batch_translate(self, texts: List[str], from_lang: str = "en", to_lang: str = "zh") -> List[str]:
+        # 译文只在本次调用中保留，已写入日志的片段不在内存中累积
+        translations = {}
+        pending = []
+        for text in dict.fromkeys(text for text in texts if text.strip()):
+            resumed = self.journal.take(text)
+            if resumed is None:
+                pending.append(text)
+            else:
+                translations[text] = resumed
+        for chunk in iter_checkpoint_batches(pending, self.checkpoint_chars):
+            translated = dict(zip(chunk, self.translator.batch_translate(chunk, from_lang, to_lang)))
+            self.journal.append(translated)
+            translations.update(translated)
+
+        return [translations[text] if text.strip() else text for text in texts]
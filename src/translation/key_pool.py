@@ -0,0 +1,181 @@
+"""
+翻译密钥池：在多个服务商账户之间分摊请求
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from translation_api import TranslationAPI
+from translation.errors import (
+    TranslationError,
+    TransientTranslationError,
+    CircuitOpenError,
+    CredentialError,
+    QuotaExceededError,
+)
+
+
+class _KeyState:
+    """单个密钥的使用情况与健康状态"""
+
+    def __init__(self, name: str, translator: TranslationAPI):
+        self.name = name
+        self.translator = translator
+        self.in_flight = 0
+        self.requests = 0
+        self.characters = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.disabled_reason = None
+
+    def is_available(self, now: float) -> bool:
+        return self.disabled_reason is None and now >= self.cooldown_until
+
+
+class KeyPoolTranslationAPI(TranslationAPI):
+    """
+    由多个翻译API实例（通常对应多个账户密钥）组成的密钥池
+    按轮询或最小负载策略分发请求，密钥返回鉴权或额度错误时移出轮换，
+    出现临时错误时短暂冷却并改用其他密钥
+    """
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_LOADED = "least_loaded"
+
+    def __init__(self, translators: Dict[str, TranslationAPI], strategy: str = ROUND_ROBIN,
+                 cooldown: float = 30.0):
+        """
+        :param translators: {密钥名称: 翻译API实例}，名称仅用于统计和日志，不应包含密钥本身
+        :param strategy: 分发策略，round_robin（轮询）或 least_loaded（在途请求最少、已用字符最少优先）
+        :param cooldown: 密钥出现临时错误后暂停使用的秒数
+        """
+        if not translators:
+            raise ValueError("密钥池至少需要一个翻译API实例")
+        if strategy not in (self.ROUND_ROBIN, self.LEAST_LOADED):
+            raise ValueError(f"不支持的分发策略: {strategy}")
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self._keys = [_KeyState(name, translator) for name, translator in translators.items()]
+        self._cycle = itertools.cycle(range(len(self._keys)))
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self._keys))
+        first = self._keys[0].translator
+        self.provider = getattr(first, 'provider', type(first).__name__)
+
+    def translate(self, text: str, from_lang: str = "en", to_lang: str = "zh") -> str:
+        return self._dispatch(lambda translator: translator.translate(text, from_lang, to_lang), len(text))
+
+    def batch_translate(self, texts: List[str], from_lang: str = "en", to_lang: str = "zh") -> List[str]:
+        # 按可用密钥数切分，各子批次并行发往不同密钥，从而叠加各账户的QPS配额
+        with self._lock:
+            now = time.monotonic()
+            available = sum(1 for state in self._keys if state.is_available(now))
+        parts = max(1, min(available, len(texts)))
+        size = -(-len(texts) // parts) if texts else 0
+        chunks = [texts[i:i + size] for i in range(0, len(texts), size)] if texts else []
+        if len(chunks) <= 1:
+            return self._translate_chunk(texts, from_lang, to_lang)
+
+        results = self._executor.map(lambda chunk: self._translate_chunk(chunk, from_lang, to_lang), chunks)
+        return [text for chunk_result in results for text in chunk_result]
+
+    def _translate_chunk(self, texts: List[str], from_lang: str, to_lang: str) -> List[str]:
+        """将一个子批次发往选中的密钥"""
+        characters = sum(len(text) for text in texts)
+        return self._dispatch(
+            lambda translator: translator.batch_translate(texts, from_lang, to_lang), characters
+        )
+
+    def _dispatch(self, call: Callable[[TranslationAPI], object], characters: int):
+        """
+        选择一个密钥执行请求，密钥不可用时自动换用下一个
+        :param call: 以翻译API实例为参数的请求函数
+        :param characters: 本次请求的字符数，用于统计各密钥的额度消耗
+        """
+        tried = set()
+        last_error = None
+        while True:
+            state = self._acquire(tried)
+            if state is None:
+                if last_error:
+                    raise last_error
+                raise TranslationError("密钥池中没有可用的密钥")
+
+            try:
+                result = call(state.translator)
+            except (CredentialError, QuotaExceededError) as e:
+                reason = "quota" if isinstance(e, QuotaExceededError) else "credential"
+                print(f"密钥 {state.name} 已移出轮换 ({reason}): {e}")
+                self._release(state, disabled_reason=reason)
+                tried.add(state.name)
+                last_error = e
+            except (TransientTranslationError, CircuitOpenError) as e:
+                self._release(state, failed=True)
+                tried.add(state.name)
+                last_error = e
+            except Exception:
+                self._release(state)
+                raise
+            else:
+                self._release(state, characters=characters)
+                return result
+
+    def _acquire(self, exclude: set) -> Optional[_KeyState]:
+        """按策略选择一个可用的密钥并登记在途请求"""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [
+                state for state in self._keys
+                if state.name not in exclude and state.is_available(now)
+            ]
+            if not candidates:
+                return None
+
+            if self.strategy == self.LEAST_LOADED:
+                state = min(candidates, key=lambda s: (s.in_flight, s.characters))
+            else:
+                state = None
+                for _ in range(len(self._keys)):
+                    next_state = self._keys[next(self._cycle)]
+                    if next_state in candidates:
+                        state = next_state
+                        break
+            state.in_flight += 1
+            return state
+
+    def _release(self, state: _KeyState, characters: int = 0, failed: bool = False,
+                 disabled_reason: Optional[str] = None) -> None:
+        """登记请求结果，更新密钥的统计和健康状态"""
+        with self._lock:
+            state.in_flight -= 1
+            state.requests += 1
+            if disabled_reason:
+                state.disabled_reason = disabled_reason
+            elif failed:
+                state.failures += 1
+                state.cooldown_until = time.monotonic() + self.cooldown
+            else:
+                state.failures = 0
+                state.characters += characters
+
+    def stats(self) -> List[Dict[str, object]]:
+        """
+        获取各密钥的使用统计
+        :return: 每个密钥的名称、请求数、字符数、失败次数和是否可用
+        """
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "name": state.name,
+                    "requests": state.requests,
+                    "characters": state.characters,
+                    "failures": state.failures,
+                    "available": state.is_available(now),
+                    "disabled_reason": state.disabled_reason,
+                }
+                for state in self._keys
+            ]
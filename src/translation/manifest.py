@@ -0,0 +1,147 @@
+"""
+增量翻译清单：在译文旁保存 {块内容哈希: 译文}，重新翻译时只提交新增或修改过的块
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path_for(output_file: str) -> str:
+    """
+    获取译文对应的清单文件路径，例如 paper_translated.md -> paper_translated.manifest.json
+    :param output_file: 译文文件路径
+    :return: 清单文件路径
+    """
+    return os.path.splitext(output_file)[0] + '.manifest.json'
+
+
+def hash_block(block: str) -> str:
+    """
+    计算块内容的哈希
+    :param block: 块的原文，包括行尾换行符
+    :return: 十六进制的sha256摘要
+    """
+    return hashlib.sha256(block.encode('utf-8')).hexdigest()
+
+
+class TranslationManifest:
+    """
+    增量翻译清单
+    读取上一次翻译时保存的块译文，本次翻译中用到的块随即追加到清单旁的临时文件，内存中只保留块的哈希，
+    流式翻译大文件时内存占用不随文档增长；保存时只写入本次文档中仍然存在的块，已删除块的译文随之清理
+    """
+
+    def __init__(self, path: str, source_lang: str, target_lang: str, fingerprint: Optional[str] = None):
+        """
+        :param path: 清单文件路径，文件不存在时从空清单开始
+        :param source_lang: 源语言
+        :param target_lang: 目标语言，与清单中记录的语言不一致时不复用旧的译文
+        :param fingerprint: 影响译文的其他设置（如术语表）的摘要，与清单中记录的不一致时不复用旧的译文
+        """
+        self.path = path
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.fingerprint = fingerprint
+        self._previous = self._load()
+        self._current = set()  # 本次用到的块的哈希，译文已写入临时文件
+        self._partial_path = path + '.partial'
+        self._partial = None
+        self.reused = 0
+        self.translated = 0
+
+    def _load(self) -> Dict[str, str]:
+        """读取清单文件，文件损坏或语言不匹配时返回空字典"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"增量翻译清单无法读取，将重新翻译全文: {e}")
+            return {}
+
+        if (data.get('version') != MANIFEST_VERSION
+                or data.get('source_lang') != self.source_lang
+                or data.get('target_lang') != self.target_lang
+                or data.get('fingerprint') != self.fingerprint):
+            return {}
+        blocks = data.get('blocks')
+        return blocks if isinstance(blocks, dict) else {}
+
+    def get(self, block: str) -> Optional[str]:
+        """
+        查找块的已有译文
+        :param block: 块的原文
+        :return: 译文，清单中没有时返回None
+        """
+        key = hash_block(block)
+        translation = self._previous.get(key)
+        if translation is not None:
+            self._record(key, translation)
+            self.reused += 1
+        return translation
+
+    def put(self, block: str, translation: str) -> None:
+        """
+        记录块的译文
+        :param block: 块的原文
+        :param translation: 块的译文
+        """
+        self._record(hash_block(block), translation)
+        self.translated += 1
+
+    def _record(self, key: str, translation: str) -> None:
+        """把本次用到的块追加到临时文件，同一个块只写一次"""
+        if key in self._current:
+            return
+        if self._partial is None:
+            self._partial = open(self._partial_path, 'w', encoding='utf-8')
+        self._partial.write(json.dumps([key, translation], ensure_ascii=False) + '\n')
+        self._current.add(key)
+
+    def save(self) -> None:
+        """
+        将本次用到的块写入清单文件：逐条读取临时文件写出，不在内存中组装整个清单；
+        先写临时文件再替换，避免中断时留下损坏的清单
+        """
+        header = {
+            'version': MANIFEST_VERSION,
+            'source_lang': self.source_lang,
+            'target_lang': self.target_lang,
+            'fingerprint': self.fingerprint,
+        }
+        if self._partial is not None:
+            self._partial.close()
+            self._partial = None
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "blocks": {')
+            if self._current:
+                with open(self._partial_path, 'r', encoding='utf-8') as partial:
+                    for index, line in enumerate(partial):
+                        key, translation = json.loads(line)
+                        f.write(', ' if index else '')
+                        f.write(f"{json.dumps(key)}: {json.dumps(translation, ensure_ascii=False)}")
+            f.write('}}')
+        os.replace(tmp_path, self.path)
+        self.close()
+
+    def close(self) -> None:
+        """删除临时文件；没有调用save时清单文件保持不变"""
+        if self._partial is not None:
+            self._partial.close()
+            self._partial = None
+        if os.path.exists(self._partial_path):
+            os.remove(self._partial_path)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取复用统计
+        :return: 复用的块数、重新翻译的块数
+        """
+        return {"reused": self.reused, "translated": self.translated}
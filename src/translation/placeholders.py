@@ -0,0 +1,113 @@
+"""
+占位符保护：在翻译前把代码块、HTML表格、数学公式和术语表中的术语替换为占位符，翻译后再还原
+保护和还原各只需要对全文扫描一遍
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+from translation.glossary import Glossary
+
+
+# 所有占位符的统一匹配模式，用于一次性还原
+PLACEHOLDER_PATTERN = re.compile(
+    r'__(?:CODE_BLOCK|MATH_BLOCK|MATH_INLINE|GLOSSARY)_\d+__|HTML_TABLE_PLACEHOLDER_\d+__'
+)
+# HTML表格占位符
+TABLE_PLACEHOLDER_PATTERN = re.compile(r'HTML_TABLE_PLACEHOLDER_\d+__')
+
+# 各类受保护内容的匹配模式，按优先级排列：同一位置上先匹配到的类型生效
+_PROTECT_PATTERNS = (
+    # 代码块：以```开头的行到下一个以```开头的行为止，未闭合的代码块延续到文末
+    ('code', r'^[ \t]*```[^\n]*(?:\n.*?^[ \t]*```[^\n]*$|.*\Z)'),
+    # HTML表格（MinerU输出的表格形式），包括紧随其后的</body></html>
+    ('table', r'<html>.*?</table>(?:\s*</body>)?(?:\s*</html>)?'),
+    # 块级数学公式
+    ('math_block', r'\$\$[^$]+?\$\$'),
+    # 行内数学公式
+    ('math_inline', r'\$[^$]+?\$'),
+)
+
+
+class PlaceholderEngine:
+    """
+    占位符引擎
+    使用一个带命名分组的组合正则一次扫描完成所有类型的保护，
+    还原时用一个正则加字典查找一次完成，耗时与文本长度成正比，与占位符数量无关
+    """
+
+    def __init__(self, protect_code: bool = True, protect_tables: bool = True, protect_math: bool = True,
+                 glossary: Optional[Glossary] = None):
+        """
+        :param protect_code: 是否保护代码块
+        :param protect_tables: 是否保护HTML表格
+        :param protect_math: 是否保护数学公式
+        :param glossary: 术语表（可选），术语在代码块、表格和公式之外按固定译名替换或原样保留
+        """
+        self.glossary = glossary
+        enabled = {
+            'code': protect_code,
+            'table': protect_tables,
+            'math_block': protect_math,
+            'math_inline': protect_math,
+        }
+        combined = '|'.join(f'(?P<{kind}>{pattern})' for kind, pattern in _PROTECT_PATTERNS if enabled[kind])
+        self._pattern = re.compile(combined, re.MULTILINE | re.DOTALL) if combined else None
+
+    def protect(self, text: str) -> Tuple[str, Dict[str, str]]:
+        """
+        将受保护的内容替换为占位符
+        :param text: 原始文本
+        :return: (替换后的文本, {占位符: 还原时使用的内容})
+        """
+        placeholders = {}
+        if self._pattern is None:
+            return self.protect_glossary(text, placeholders), placeholders
+
+        counter = 0
+
+        def replace(match):
+            nonlocal counter
+            kind = match.lastgroup
+            content = match.group(0)
+            if kind == 'code':
+                placeholder = f"__CODE_BLOCK_{counter}__"
+                placeholders[placeholder] = content
+            elif kind == 'table':
+                placeholder = f"HTML_TABLE_PLACEHOLDER_{counter}__"
+                placeholders[placeholder] = content
+            elif kind == 'math_block':
+                # 块级公式还原时添加居中样式，确保在最终PDF中正确渲染
+                placeholder = f"__MATH_BLOCK_{counter}__"
+                placeholders[placeholder] = f'<div class="math-block">{content}</div>'
+            else:
+                placeholder = f"__MATH_INLINE_{counter}__"
+                placeholders[placeholder] = f'<span class="math-inline">{content}</span>'
+            counter += 1
+            return placeholder
+
+        return self.protect_glossary(self._pattern.sub(replace, text), placeholders), placeholders
+
+    def protect_glossary(self, text: str, placeholders: Dict[str, str]) -> str:
+        """
+        替换文本中的术语：protect在其他内容保护完成后调用，术语不会出现在代码块、表格和公式中；
+        翻译表格单元格时也对单元格文本单独调用
+        :param text: 要处理的文本
+        :param placeholders: 占位符字典，术语的占位符会加入其中
+        :return: 替换后的文本，没有术语表时原样返回
+        """
+        if not self.glossary:
+            return text
+        return self.glossary.protect(text, placeholders)
+
+    @staticmethod
+    def restore(text: str, placeholders: Dict[str, str]) -> str:
+        """
+        将占位符还原为原始内容
+        :param text: 带有占位符的文本
+        :param placeholders: protect返回的占位符字典
+        :return: 还原后的文本，未知的占位符保持不变
+        """
+        if not placeholders:
+            return text
+        return PLACEHOLDER_PATTERN.sub(lambda match: placeholders.get(match.group(0), match.group(0)), text)
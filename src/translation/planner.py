@@ -0,0 +1,112 @@
+"""
+翻译预演：走完整的解析与分批流程，但不向翻译服务发出任何请求，
+统计片段数、字符数和请求数，并按配置的QPS估算耗时
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from translation_api import TranslationAPI, pack_segments, split_segment, BAIDU_MAX_QUERY_BYTES
+from translation.journal import iter_checkpoint_batches
+
+
+class DryRunTranslationAPI(TranslationAPI):
+    """
+    预演用的翻译API
+    按断点日志的检查点批次、密钥池在各密钥之间的切分方式，
+    以及百度翻译API的分批规则（含换行的片段单独请求，其余片段按字节上限合并）统计请求数，原样返回原文
+    """
+
+    provider = "dry_run"
+
+    def __init__(self, max_query_bytes: int = BAIDU_MAX_QUERY_BYTES, checkpoint_chars: Optional[int] = None,
+                 key_count: int = 1):
+        """
+        :param max_query_bytes: 单次请求的字节上限
+        :param checkpoint_chars: 断点日志每个检查点批次的字符数，为None时不按检查点切分
+        :param key_count: 密钥池中的密钥数，多于一个时与KeyPoolTranslationAPI一样把每批片段平均分给各密钥
+        """
+        self.max_query_bytes = max_query_bytes
+        self.checkpoint_chars = checkpoint_chars
+        self.key_count = max(1, key_count)
+        self.requests = 0
+        self.key_requests = [0] * self.key_count  # 各密钥分到的请求数，按轮询顺序分配
+        self.segments = 0
+        self.characters = 0
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def translate(self, text: str, from_lang: str = "en", to_lang: str = "zh") -> str:
+        if text.strip():
+            self._record([1], 1, len(text))
+        return text
+
+    def batch_translate(self, texts: List[str], from_lang: str = "en", to_lang: str = "zh") -> List[str]:
+        pending = [text for text in texts if text.strip()]
+        batches = iter_checkpoint_batches(pending, self.checkpoint_chars) if self.checkpoint_chars else [pending]
+        for batch in batches:
+            if not batch:
+                continue
+            # 与KeyPoolTranslationAPI.batch_translate相同：按密钥数把片段平均切成几份，每份发往一个密钥
+            parts = min(self.key_count, len(batch))
+            size = -(-len(batch) // parts)
+            chunk_requests = [self._count_requests(batch[i:i + size]) for i in range(0, len(batch), size)]
+            self._record(chunk_requests, len(batch), sum(len(text) for text in batch))
+        return list(texts)
+
+    def _count_requests(self, texts: List[str]) -> int:
+        """一个密钥翻译这些片段需要的请求数"""
+        multiline = [text for text in texts if '\n' in text or '\r' in text]
+        # 超长片段与实际翻译时一样先拆开再打包
+        cores = [piece.strip() for text in texts if '\n' not in text and '\r' not in text
+                 for piece in split_segment(text, self.max_query_bytes) if piece.strip()]
+        return len(multiline) + len(pack_segments(cores, self.max_query_bytes))
+
+    @property
+    def busiest_key_requests(self) -> int:
+        """请求最多的密钥分到的请求数，各密钥并行工作，总耗时取决于它"""
+        return max(self.key_requests)
+
+    def _record(self, chunk_requests: List[int], segments: int, characters: int) -> None:
+        with self._lock:
+            for requests in chunk_requests:
+                self.key_requests[self._next_key] += requests
+                self._next_key = (self._next_key + 1) % self.key_count
+            self.requests += sum(chunk_requests)
+            self.segments += segments
+            self.characters += characters
+
+
+def estimate_duration(requests: int, qps: float) -> float:
+    """
+    按QPS配额估算发出全部请求所需的时间
+    :param requests: 请求数；多个密钥并行发送时为分到请求最多的密钥的请求数
+    :param qps: 每秒允许的请求数；多个密钥并行发送时为单个密钥的配额
+    :return: 预计耗时（秒）
+    """
+    if requests <= 0:
+        return 0.0
+    return requests / qps if qps > 0 else float('inf')
+
+
+def format_plan(plan: Dict[str, object]) -> str:
+    """
+    将预演结果格式化为可读的报告
+    :param plan: 预演结果
+    :return: 多行文本
+    """
+    seconds = plan["estimated_seconds"]
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return "\n".join([
+        f"翻译预演: {plan['input_file']}",
+        f"  片段总数: {plan['segments']}",
+        f"  去重后片段: {plan['unique_segments']}",
+        f"  本地跳过: {plan['skipped_segments']}",
+        f"  增量复用的块: {plan['reused_blocks']}",
+        f"  需要翻译的片段: {plan['request_segments']}",
+        f"  需要翻译的字符: {plan['characters']}",
+        f"  预计HTTP请求: {plan['requests']}",
+        f"  密钥数: {plan['keys']}",
+        f"  QPS配额: {plan['qps']:g}",
+        f"  预计耗时: {minutes} 分 {secs} 秒",
+    ])
@@ -0,0 +1,109 @@
+"""
+翻译请求的限流：令牌桶与AIMD自适应速率
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+    令牌以rate个/秒的速度补充，最多积累capacity个，每次请求消耗一个令牌
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        :param rate: 每秒补充的令牌数，即允许的QPS
+        :param capacity: 桶容量，即允许的突发请求数，默认与一秒的配额相同（至少为1）
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """按流逝的时间补充令牌，调用方需持有锁"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，令牌不足时阻塞等待
+        :param tokens: 需要的令牌数
+        :return: 实际等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def set_rate(self, rate: float) -> None:
+        """调整补充速度，已积累的令牌按旧速度结算"""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def drain(self) -> None:
+        """清空桶内令牌，使后续请求按当前速度重新排队"""
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD自适应限流器
+    每次成功请求后速率加性增加，直到账户配额max_rate；
+    收到限流错误后速率乘性减少，并清空令牌桶，使请求速度贴近服务商实际允许的上限
+    """
+
+    def __init__(self, max_rate: float, min_rate: float = 0.1, increase_step: Optional[float] = None,
+                 decrease_factor: float = 0.5):
+        """
+        :param max_rate: 速率上限（QPS），通常为账户等级对应的配额
+        :param min_rate: 速率下限（QPS）
+        :param increase_step: 每次成功后增加的QPS，默认为max_rate的5%
+        :param decrease_factor: 收到限流错误后速率乘以的系数
+        """
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.increase_step = increase_step if increase_step is not None else max_rate * 0.05
+        self.decrease_factor = decrease_factor
+        self.throttled_count = 0
+        self._bucket = TokenBucket(max_rate)
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """当前速率（QPS）"""
+        return self._bucket.rate
+
+    def acquire(self) -> float:
+        """
+        在发出请求前调用，按当前速率阻塞等待
+        :return: 实际等待的秒数
+        """
+        return self._bucket.acquire()
+
+    def on_success(self) -> None:
+        """请求成功：加性增加速率"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._bucket.set_rate(min(self.max_rate, self.rate + self.increase_step))
+
+    def on_throttle(self) -> None:
+        """请求被限流：乘性减少速率，并清空令牌桶"""
+        with self._lock:
+            self.throttled_count += 1
+            self._bucket.set_rate(max(self.min_rate, self.rate * self.decrease_factor))
+            self._bucket.drain()
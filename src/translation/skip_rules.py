@@ -0,0 +1,142 @@
+"""
+本地跳过规则：在发出请求前识别不需要翻译的片段
+纯数字、引用标号、DOI、URL、带单位的数值、变量名、单个符号以及已经是目标语言文字的文本原样保留
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+_NUMBER = r'[-+−±~≈<>≤≥]?\d+(?:[.,]\d+)*(?:[eE][-+−]?\d+)?'
+_UNIT = (
+    r'(?:[kMGTmµμn]?(?:m|g|s|Hz|W|V|A|J|Pa|B|bps|FLOPS|eV|L)|K|°C|°F|mol|dB|ppm|min|h|px|pt|[KMGT]iB)'
+    r'(?:\^?[-−]?\d)?'
+)
+
+# 整个片段匹配以下模式之一时不需要翻译，按优先级排列
+_SKIP_PATTERNS = (
+    ('doi', r'(?:doi:\s*|https?://(?:dx\.)?doi\.org/)10\.\d{4,9}/\S+|10\.\d{4,9}/\S+'),
+    ('url', r'(?:https?|ftp)://\S+|www\.\S+\.\S+|[\w.+-]+@[\w-]+(?:\.[\w-]+)+'),
+    ('citation', r'(?:\[\d+(?:\s*[-–,]\s*\d+)*\]\s*)+|\(\d+(?:\s*[-–,]\s*\d+)*\)'),
+    ('number', rf'{_NUMBER}(?:\s*[-–~]\s*{_NUMBER})?\s*%?'),
+    ('unit', rf'{_NUMBER}(?:\s*[-–~]\s*{_NUMBER})?\s*{_UNIT}(?:\s*[/·]\s*{_UNIT})*'),
+    # 变量名和代码标识符：含下划线或点的标识符、驼峰命名、字母数字混合、函数调用、单个字母
+    ('identifier', r'[A-Za-z_][A-Za-z0-9]*(?:[_.][A-Za-z0-9]+)+(?:\(\))?|[a-z]+(?:[A-Z][a-z0-9]*)+(?:\(\))?'
+                   r'|[A-Za-z]+\d+[A-Za-z0-9]*|[A-Za-z_]\w*\(\)|[A-Za-z\u03b1-\u03c9\u0391-\u03a9]\'?'),
+)
+_SKIP_RE = re.compile('|'.join(f'(?P<{kind}>{pattern})' for kind, pattern in _SKIP_PATTERNS))
+
+# 任意语言的字母（不含数字和下划线）
+_LETTER_RE = re.compile(r'[^\W\d_]')
+_WORD_RE = re.compile(r'[^\W\d_]+')
+
+# 各文字系统的字符范围
+_SCRIPT_RES = {
+    'han': re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0002a6df]'),
+    'kana': re.compile(r'[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f]'),
+    'hangul': re.compile(r'[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]'),
+    'cyrillic': re.compile(r'[\u0400-\u04ff]'),
+    'arabic': re.compile(r'[\u0600-\u06ff\u0750-\u077f]'),
+    'greek': re.compile(r'[\u0370-\u03ff]'),
+    'thai': re.compile(r'[\u0e00-\u0e7f]'),
+}
+
+# 百度翻译语言代码对应的文字系统；拉丁字母语言之间无法仅凭文字区分，不在此列
+LANG_SCRIPTS = {
+    'zh': 'han', 'cht': 'han', 'yue': 'han', 'wyw': 'han',
+    'jp': 'kana',
+    'kor': 'hangul',
+    'ru': 'cyrillic', 'bul': 'cyrillic', 'ukr': 'cyrillic',
+    'ara': 'arabic',
+    'el': 'greek',
+    'th': 'thai',
+}
+
+
+class SegmentClassifier:
+    """
+    片段分类器
+    判断片段是否可以不经翻译直接保留，并统计节省的请求数和字符数
+    """
+
+    def __init__(self, source_lang: str, target_lang: str, target_script_ratio: float = 0.8):
+        """
+        :param source_lang: 源语言，为auto时同样根据文字判断片段是否已是目标语言
+        :param target_lang: 目标语言
+        :param target_script_ratio: 目标文字（按字计）占全部文字（其他文字按词计）的比例达到该值时视为已是目标语言
+        """
+        self.target_script_ratio = target_script_ratio
+        # 源语言与目标语言使用同一种文字时（例如俄语译为乌克兰语），无法按文字判断
+        target_script = LANG_SCRIPTS.get(target_lang)
+        if target_script and LANG_SCRIPTS.get(source_lang) == target_script:
+            target_script = None
+        self.target_script = target_script
+        self.stats = {}
+
+    def classify(self, text: str) -> Optional[str]:
+        """
+        判断片段是否不需要翻译
+        :param text: 片段原文
+        :return: 不需要翻译的原因（doi、url、citation、number、unit、identifier、symbol、target_script），需要翻译时返回None
+        """
+        stripped = text.strip()
+        if not stripped:
+            return 'symbol'
+
+        match = _SKIP_RE.fullmatch(stripped)
+        if match:
+            return match.lastgroup
+
+        if not _LETTER_RE.search(stripped):
+            return 'symbol'
+
+        if self.target_script and self._is_target_script(stripped):
+            return 'target_script'
+        return None
+
+    def _is_target_script(self, text: str) -> bool:
+        """
+        判断文本中目标文字的占比是否达到阈值
+        目标文字按字计数，其他文字按词计数，夹杂少量英文术语的中文句子仍视为中文
+        """
+        if self.target_script == 'kana':
+            # 日文由汉字和假名组成，必须出现假名才能与中文区分
+            if not _SCRIPT_RES['kana'].search(text):
+                return False
+            target_res = (_SCRIPT_RES['kana'], _SCRIPT_RES['han'])
+        else:
+            if self.target_script == 'han' and _SCRIPT_RES['kana'].search(text):
+                return False
+            target_res = (_SCRIPT_RES[self.target_script],)
+
+        count = 0
+        for script_re in target_res:
+            text, matched = script_re.subn(' ', text)
+            count += matched
+        other = len(_WORD_RE.findall(text))
+        return count > 0 and count >= self.target_script_ratio * (count + other)
+
+    def partition(self, texts: List[str]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        将片段分为需要翻译和可以跳过的两部分，并更新统计
+        :param texts: 去重后的片段
+        :return: (需要翻译的片段, {跳过的片段: 原因})
+        """
+        to_translate = []
+        skipped = {}
+        for text in texts:
+            reason = self.classify(text)
+            if reason is None:
+                to_translate.append(text)
+            else:
+                skipped[text] = reason
+
+        by_reason = {}
+        for reason in skipped.values():
+            by_reason[reason] = by_reason.get(reason, 0) + 1
+        self.stats = {
+            "saved_requests": len(skipped),
+            "saved_chars": sum(len(text) for text in skipped),
+            "by_reason": by_reason,
+        }
+        return to_translate, skipped
@@ -1,9 +1,124 @@
 import abc
 import hashlib
 import random
-import requests
 import json
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Optional
+
+from translation.errors import (
+    TranslationError,
+    TransientTranslationError,
+    RateLimitError,
+    CredentialError,
+    QuotaExceededError,
+)
+from translation.transport import HTTPTransport
+from translation.rate_limiter import AdaptiveRateLimiter
+
+
+# 百度翻译API单次请求q参数的字节上限（UTF-8编码），官方建议控制在6000 bytes以内
+BAIDU_MAX_QUERY_BYTES = 6000
+
+# 句末标点（可带右引号、右括号）及其后的空白，超长片段在这些位置拆开
+_SENTENCE_BOUNDARY_RE = re.compile(r'[.!?;\u3002\uff01\uff1f\uff1b]+["\'\u201d\u2019)\]]*\s*')
+# 百度翻译API中可以重试的错误码：请求超时、系统错误
+BAIDU_TRANSIENT_ERROR_CODES = {'52001', '52002'}
+# 百度翻译API中表示访问频率受限的错误码：访问频率受限、长query请求频繁
+BAIDU_RATE_LIMIT_ERROR_CODES = {'54003', '54005'}
+# 百度翻译API中表示密钥不可用的错误码：未授权用户、签名错误、客户端IP非法、服务已关闭、认证未通过
+BAIDU_CREDENTIAL_ERROR_CODES = {'52003', '54001', '58000', '58002', '90107'}
+# 百度翻译API中表示额度用尽的错误码：账户余额不足
+BAIDU_QUOTA_ERROR_CODES = {'54004'}
+# 百度翻译各账户等级的QPS配额：标准版、高级版、尊享版
+BAIDU_TIER_QPS = {'standard': 1, 'advanced': 10, 'premium': 100}
+
+
+def pack_segments(texts: List[str], max_bytes: int = BAIDU_MAX_QUERY_BYTES) -> List[List[int]]:
+    """
+    将多个片段按字节上限打包成若干批次，片段之间以换行符分隔
+    :param texts: 片段列表（不应包含换行符）
+    :param max_bytes: 单个批次允许的最大字节数
+    :return: 批次列表，每个批次为片段在texts中的下标列表，保持原始顺序
+    """
+    chunks = []
+    current = []
+    current_bytes = 0
+    for i, text in enumerate(texts):
+        size = len(text.encode('utf-8'))
+        # 加上分隔用的换行符后超出上限，则先结束当前批次
+        if current and current_bytes + 1 + size > max_bytes:
+            chunks.append(current)
+            current = []
+            current_bytes = 0
+        current_bytes += size + (1 if current else 0)
+        current.append(i)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_segment(text: str, max_bytes: int = BAIDU_MAX_QUERY_BYTES) -> List[str]:
+    """
+    将超过字节上限的片段拆成若干段，优先在句子边界处拆开，
+    单个句子仍然超长时在上限内最后一个空白处拆开，没有空白时按字符边界硬切
+    :param text: 片段
+    :param max_bytes: 每段允许的最大字节数
+    :return: 各段按顺序直接拼接即为原文；未超长的片段原样作为唯一的一段
+    """
+    if len(text.encode('utf-8')) <= max_bytes:
+        return [text]
+    
+    sentences = []
+    pos = 0
+    for match in _SENTENCE_BOUNDARY_RE.finditer(text):
+        sentences.append(text[pos:match.end()])
+        pos = match.end()
+    if pos < len(text):
+        sentences.append(text[pos:])
+    
+    pieces = []
+    current = ''
+    current_bytes = 0
+    for sentence in sentences:
+        size = len(sentence.encode('utf-8'))
+        if current_bytes + size <= max_bytes:
+            current += sentence
+            current_bytes += size
+            continue
+        if current:
+            pieces.append(current)
+        while size > max_bytes:
+            cut = _byte_boundary_cut(sentence, max_bytes)
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:]
+            size = len(sentence.encode('utf-8'))
+        current, current_bytes = sentence, size
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _byte_boundary_cut(text: str, max_bytes: int) -> int:
+    """不超过字节上限的前缀长度（字符数），尽量在最后一个空白之后断开"""
+    prefix = text.encode('utf-8')[:max_bytes].decode('utf-8', errors='ignore')
+    for i in range(len(prefix) - 1, 0, -1):
+        if prefix[i].isspace():
+            return i + 1
+    return max(1, len(prefix))
+
+
+def restore_whitespace(original: str, translated: str) -> str:
+    """
+    将原文片段的首尾空白补回到译文上，翻译服务会去掉片段首尾的空白
+    :param original: 原文片段
+    :param translated: 去掉首尾空白后翻译得到的译文
+    :return: 补回空白的译文，原文只有空白时原样返回
+    """
+    core = original.strip()
+    if not core:
+        return original
+    start = original.index(core)
+    return original[:start] + translated + original[start + len(core):]
 
 
 class TranslationAPI(abc.ABC):
@@ -35,15 +150,68 @@ class TranslationAPI(abc.ABC):
 class BaiduTranslationAPI(TranslationAPI):
     """百度翻译API实现"""
     
-    def __init__(self, app_id: str, app_key: str):
+    provider = "baidu"
+    
+    def __init__(self, app_id: str, app_key: str, transport: Optional[HTTPTransport] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
         """
         初始化百度翻译API
         :param app_id: 百度翻译API的APP ID
         :param app_key: 百度翻译API的密钥
+        :param transport: HTTP传输层，默认新建一个带连接池的实例，可在多个翻译器之间共享
+        :param rate_limiter: 限流器，默认按标准版账户的QPS配额创建；QPS配额按APP ID计算，不应在不同密钥间共享
         """
         self.app_id = app_id
         self.app_key = app_key
         self.url = "https://fanyi-api.baidu.com/api/trans/vip/translate"
+        self.max_query_bytes = BAIDU_MAX_QUERY_BYTES
+        self.transport = transport or HTTPTransport()
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(BAIDU_TIER_QPS['standard'])
+
+    def _request(self, query: str, from_lang: str, to_lang: str) -> Dict[str, Any]:
+        """
+        发送一次翻译请求
+        :param query: 请求的q参数，可以包含以换行符分隔的多个片段
+        :param from_lang: 源语言
+        :param to_lang: 目标语言
+        :return: 接口返回的JSON结果
+        """
+        salt = str(random.randint(32768, 65536))
+        sign = hashlib.md5((self.app_id + query + salt + self.app_key).encode()).hexdigest()
+        
+        data = {
+            'q': query,
+            'from': from_lang,
+            'to': to_lang,
+            'appid': self.app_id,
+            'salt': salt,
+            'sign': sign
+        }
+        
+        # 使用POST提交表单，避免长文本超出URL长度限制
+        return self.transport.post_json(self.url, data, check=self._check_response,
+                                        rate_limiter=self.rate_limiter)
+    
+    @staticmethod
+    def _check_response(result: Dict[str, Any]) -> None:
+        """
+        检查接口返回的错误码，并转换为对应的异常类型
+        :param result: 接口返回的JSON结果
+        """
+        if 'trans_result' in result:
+            return
+        
+        code = str(result.get('error_code', ''))
+        message = f"百度翻译错误 {code}: {result.get('error_msg', result)}"
+        if code in BAIDU_RATE_LIMIT_ERROR_CODES:
+            raise RateLimitError(message, code=code)
+        if code in BAIDU_TRANSIENT_ERROR_CODES:
+            raise TransientTranslationError(message, code=code)
+        if code in BAIDU_CREDENTIAL_ERROR_CODES:
+            raise CredentialError(message, code=code)
+        if code in BAIDU_QUOTA_ERROR_CODES:
+            raise QuotaExceededError(message, code=code)
+        raise TranslationError(message, code=code)
         
     def translate(self, text: str, from_lang: str = "en", to_lang: str = "zh") -> str:
         """
@@ -52,34 +220,19 @@ class BaiduTranslationAPI(TranslationAPI):
         :param from_lang: 源语言，默认为英语
         :param to_lang: 目标语言，默认为中文
         :return: 翻译后的文本
+        :raises TranslationError: 重试后仍然失败
         """
         if not text.strip():
             return text
-            
-        salt = str(random.randint(32768, 65536))
-        sign = hashlib.md5((self.app_id + text + salt + self.app_key).encode()).hexdigest()
         
-        params = {
-            'q': text,
-            'from': from_lang,
-            'to': to_lang,
-            'appid': self.app_id,
-            'salt': salt,
-            'sign': sign
-        }
+        # 超过单次请求字节上限时拆开翻译，各段都不超过上限
+        pieces = split_segment(text, self.max_query_bytes)
+        if len(pieces) > 1:
+            return ''.join(self.batch_translate(pieces, from_lang, to_lang))
         
-        try:
-            response = requests.get(self.url, params=params)
-            result = response.json()
-            
-            if 'trans_result' in result:
-                return result['trans_result'][0]['dst']
-            else:
-                print(f"翻译错误: {result}")
-                return text
-        except Exception as e:
-            print(f"翻译请求出错: {e}")
-            return text
+        result = self._request(text, from_lang, to_lang)
+        # 含换行符的文本会被拆成多段返回，按行拼接回去
+        return '\n'.join(item['dst'] for item in result['trans_result'])
     
     def batch_translate(self, texts: List[str], from_lang: str = "en", to_lang: str = "zh") -> List[str]:
         """
@@ -88,10 +241,59 @@ class BaiduTranslationAPI(TranslationAPI):
         :param from_lang: 源语言，默认为英语
         :param to_lang: 目标语言，默认为中文
         :return: 翻译后的文本列表
+        :raises TranslationError: 重试后仍然失败
         """
-        # 百度翻译API限制了单次请求的字符数，需要将长文本切分
-        # 由于字符限制，这里简单实现为单个翻译
-        results = []
-        for text in texts:
-            results.append(self.translate(text, from_lang, to_lang))
-        return results 
\ No newline at end of file
+        results = list(texts)
+        
+        # 收集可以合并请求的片段，空白片段无需翻译
+        pending = []
+        for i, text in enumerate(texts):
+            if not text.strip():
+                continue
+            # 含换行符的片段会被接口拆成多段，无法与结果对齐，单独翻译
+            if '\n' in text or '\r' in text:
+                results[i] = self.translate(text, from_lang, to_lang)
+                continue
+            pending.append(i)
+        
+        # 超过单次请求字节上限的片段先拆成几段，各段与其他片段一起打包，翻译后再按顺序拼接
+        pieces = {i: split_segment(texts[i], self.max_query_bytes) for i in pending}
+        parts = [(i, k) for i in pending for k, piece in enumerate(pieces[i]) if piece.strip()]
+        
+        # 去掉首尾空白后再发送，翻译完成后补回，以免破坏原有排版
+        cores = [pieces[i][k].strip() for i, k in parts]
+        
+        for chunk in pack_segments(cores, self.max_query_bytes):
+            chunk_cores = [cores[j] for j in chunk]
+            translated = self._translate_chunk(chunk_cores, from_lang, to_lang)
+            for j, dst in zip(chunk, translated):
+                i, k = parts[j]
+                pieces[i][k] = restore_whitespace(pieces[i][k], dst)
+        
+        for i in pending:
+            results[i] = ''.join(pieces[i])
+        return results
+    
+    def _translate_chunk(self, segments: List[str], from_lang: str, to_lang: str) -> List[str]:
+        """
+        用一次请求翻译一批片段，结果无法按行对齐时逐个回退翻译
+        :param segments: 已去除首尾空白、不含换行符的片段列表
+        :param from_lang: 源语言
+        :param to_lang: 目标语言
+        :return: 与segments一一对应的翻译结果
+        """
+        if len(segments) == 1:
+            return [self.translate(segments[0], from_lang, to_lang)]
+        
+        result = self._request('\n'.join(segments), from_lang, to_lang)
+        trans_result = result['trans_result']
+        aligned = len(trans_result) == len(segments) and all(
+            item.get('src', '').strip() == segment
+            for item, segment in zip(trans_result, segments)
+        )
+        if aligned:
+            return [item['dst'] for item in trans_result]
+        
+        # 结果与请求的片段数量或内容对不上，逐个片段重新翻译
+        print(f"批量翻译结果无法对齐 ({len(trans_result)}/{len(segments)})，改为逐个翻译")
+        return [self.translate(segment, from_lang, to_lang) for segment in segments] 
\ No newline at end of file
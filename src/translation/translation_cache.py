@@ -0,0 +1,212 @@
+"""
+基于SQLite的持久化翻译记忆缓存
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional
+
+from translation_api import TranslationAPI, restore_whitespace
+
+
+# 连续的空格和制表符；换行符决定片段的排版，保留在缓存键中
+_INLINE_WHITESPACE_RE = re.compile(r'[ \t]+')
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化片段文本，使仅在首尾空白、行内连续空格或Unicode组合形式上不同的片段共享同一条缓存；
+    换行符保持不变，多行片段（如含换行的表格单元格）与其单行形式的译文排版不同，不共用缓存
+    :param text: 原始片段
+    :return: 规范化后的片段
+    """
+    return _INLINE_WHITESPACE_RE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def make_cache_key(text: str, from_lang: str, to_lang: str, provider: str) -> str:
+    """
+    生成缓存键：(规范化文本哈希, 源语言, 目标语言, 服务商)
+    :return: 十六进制的SHA-256摘要
+    """
+    text_hash = hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+    return hashlib.sha256(f"{provider}\0{from_lang}\0{to_lang}\0{text_hash}".encode('utf-8')).hexdigest()
+
+
+class TranslationCache:
+    """
+    SQLite翻译缓存
+    按最近访问时间做LRU淘汰，超过有效期的条目视为未命中
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 200000, ttl: Optional[float] = None):
+        """
+        :param db_path: SQLite数据库文件路径
+        :param max_entries: 最多保留的条目数，超出后淘汰最久未访问的条目
+        :param ttl: 条目有效期（秒），为None时永不过期
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        # 翻译可能在多个线程中进行，连接由锁保护
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, translation TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_translations_accessed_at ON translations (accessed_at)"
+            )
+        self.purge_expired()
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """
+        批量查询缓存
+        :param keys: 缓存键列表
+        :return: 命中的 {缓存键: 译文}
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        with self._lock:
+            # 分批查询，避免超出SQLite的参数个数限制
+            for i in range(0, len(unique_keys), 500):
+                batch = unique_keys[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, translation, created_at FROM translations WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, translation, created_at in rows:
+                    if self.ttl is None or now - created_at < self.ttl:
+                        found[key] = translation
+
+            if found:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE translations SET accessed_at = ? WHERE key = ?",
+                        [(now, key) for key in found]
+                    )
+
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        查询单条缓存
+        :param key: 缓存键
+        :return: 命中时返回译文，否则返回None
+        """
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Dict[str, str]) -> None:
+        """
+        批量写入缓存，写入后按LRU淘汰超出容量的条目
+        :param items: {缓存键: 译文}
+        """
+        if not items:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, translation, now, now) for key, translation in items.items()]
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM translations WHERE key IN "
+                    "(SELECT key FROM translations ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def set(self, key: str, translation: str) -> None:
+        """写入单条缓存"""
+        self.set_many({key: translation})
+
+    def purge_expired(self) -> int:
+        """
+        删除所有过期条目
+        :return: 删除的条目数
+        """
+        if self.ttl is None:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计信息
+        :return: 包含hits、misses、entries的字典
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedTranslationAPI(TranslationAPI):
+    """
+    为任意TranslationAPI加上翻译缓存的装饰器
+    只有未命中的片段才会交给被包装的翻译API
+    """
+
+    def __init__(self, translator: TranslationAPI, cache: TranslationCache, provider: Optional[str] = None):
+        """
+        :param translator: 被包装的翻译API
+        :param cache: 翻译缓存
+        :param provider: 服务商名称，作为缓存键的一部分，默认取翻译API的provider属性或类名
+        """
+        self.translator = translator
+        self.cache = cache
+        self.provider = provider or getattr(translator, 'provider', type(translator).__name__)
+
+    def translate(self, text: str, from_lang: str = "en", to_lang: str = "zh") -> str:
+        return self.batch_translate([text], from_lang, to_lang)[0]
+
+    def batch_translate(self, texts: List[str], from_lang: str = "en", to_lang: str = "zh") -> List[str]:
+        results = list(texts)
+        keys = {}
+        for i, text in enumerate(texts):
+            if text.strip():
+                keys[i] = make_cache_key(text, from_lang, to_lang, self.provider)
+
+        cached = self.cache.get_many(list(keys.values()))
+
+        # 未命中的片段按缓存键去重后再翻译，首尾空白在返回时补回
+        missing = {}
+        for i, key in keys.items():
+            if key not in cached and key not in missing:
+                missing[key] = texts[i].strip()
+        if missing:
+            translated = self.translator.batch_translate(list(missing.values()), from_lang, to_lang)
+            new_items = dict(zip(missing.keys(), translated))
+            self.cache.set_many(new_items)
+            cached.update(new_items)
+
+        for i, key in keys.items():
+            results[i] = restore_whitespace(texts[i], cached[key])
+        return results
+
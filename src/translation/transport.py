@@ -0,0 +1,204 @@
+"""
+翻译服务的HTTP传输层：连接池、超时、重试退避与熔断
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from translation.rate_limiter import AdaptiveRateLimiter
+from translation.errors import (
+    TranslationError,
+    TransientTranslationError,
+    RateLimitError,
+    CircuitOpenError,
+)
+
+
+# 视为临时错误、可以重试的HTTP状态码
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    连续失败达到阈值后打开，在恢复时间内直接拒绝请求；
+    恢复时间过后进入半开状态，放行一次试探请求，成功则关闭，失败则重新打开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        :param failure_threshold: 连续失败多少次后打开熔断器
+        :param recovery_timeout: 打开后经过多少秒允许试探请求
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """当前状态"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        判断是否允许发出请求
+        :return: 熔断器关闭或处于半开试探时返回True
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                # 只放行一个试探请求，其余请求在结果出来前继续被拒绝
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """记录一次成功，关闭熔断器"""
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """记录一次失败，达到阈值或试探失败时打开熔断器"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class HTTPTransport:
+    """
+    基于requests.Session的HTTP传输层
+    复用长连接，对临时错误做带抖动的指数退避重试，并通过熔断器在服务不可用时快速失败
+    """
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 10.0,
+                 circuit_breaker: Optional[CircuitBreaker] = None, max_rate_limit_retries: int = 10):
+        """
+        :param pool_size: 连接池大小，即同一主机可保持的长连接数
+        :param connect_timeout: 建立连接的超时时间（秒）
+        :param read_timeout: 等待响应的超时时间（秒）
+        :param max_retries: 临时错误的最大重试次数
+        :param backoff_base: 退避的基础等待时间（秒），每次重试翻倍
+        :param backoff_max: 单次退避的最大等待时间（秒）
+        :param circuit_breaker: 熔断器，默认新建一个
+        :param max_rate_limit_retries: 被限流时的最大重试次数，与临时错误的重试次数分开计算
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        # 重试由本类统一处理，关闭urllib3自带的重试
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post_json(self, url: str, data: Dict[str, Any],
+                  check: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  rate_limiter: Optional[AdaptiveRateLimiter] = None) -> Dict[str, Any]:
+        """
+        以表单形式POST请求并解析JSON响应，临时错误会自动重试
+        :param url: 请求地址
+        :param data: 表单数据
+        :param check: 校验响应内容的回调，发现服务商错误时应抛出TranslationError或其子类
+        :param rate_limiter: 限流器，每次发出请求前获取令牌，并根据是否被限流调整速率
+        :return: 解析后的JSON结果
+        """
+        attempt = 0
+        throttled = 0
+        while True:
+            if rate_limiter:
+                rate_limiter.acquire()
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError("翻译服务暂时不可用，熔断器已打开")
+
+            # 每次放行的请求都必须向熔断器报告结果，否则半开状态下的试探请求永远不会结束
+            resolved = False
+            try:
+                result = self._send(url, data)
+                if check:
+                    check(result)
+                self.circuit_breaker.record_success()
+                resolved = True
+                if rate_limiter:
+                    rate_limiter.on_success()
+                return result
+            except RateLimitError:
+                # 限流说明服务本身可用，按成功结束试探，不计入熔断失败次数
+                self.circuit_breaker.record_success()
+                resolved = True
+                throttled += 1
+                if throttled > self.max_rate_limit_retries:
+                    raise
+                if rate_limiter:
+                    # 由限流器降低速率，下一次acquire会按新的速率等待
+                    rate_limiter.on_throttle()
+                else:
+                    time.sleep(self._backoff(throttled - 1))
+            except TransientTranslationError:
+                self.circuit_breaker.record_failure()
+                resolved = True
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+            except TranslationError:
+                # 服务正常响应了不可重试的错误（如鉴权失败），服务本身是健康的
+                self.circuit_breaker.record_success()
+                resolved = True
+                raise
+            finally:
+                if not resolved:
+                    # 意外的异常（如响应格式异常导致check回调出错）按失败计
+                    self.circuit_breaker.record_failure()
+
+    def _send(self, url: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """发送单次请求，将网络层错误转换为翻译异常"""
+        try:
+            response = self.session.post(url, data=data, timeout=(self.connect_timeout, self.read_timeout))
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransientTranslationError(f"网络请求失败: {e}")
+
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            if response.status_code == 429:
+                raise RateLimitError("HTTP 429: 请求过于频繁", code=response.status_code)
+            raise TransientTranslationError(f"HTTP {response.status_code}", code=response.status_code)
+        if response.status_code >= 400:
+            raise TranslationError(f"HTTP {response.status_code}", code=response.status_code)
+
+        try:
+            return response.json()
+        except ValueError as e:
+            raise TransientTranslationError(f"无法解析响应内容: {e}")
+
+    def _backoff(self, attempt: int) -> float:
+        """计算第attempt次重试前的等待时间：指数增长并加入随机抖动，避免多个请求同时重试"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def close(self) -> None:
+        """关闭连接池"""
+        self.session.close()
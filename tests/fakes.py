@@ -0,0 +1,32 @@
+"""
+测试用的假传输层：不发出网络请求，按给定的处理函数返回百度翻译API格式的结果
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from translation.transport import HTTPTransport
+
+
+def upper_case_result(query):
+    """把每一行转为大写作为译文，与百度翻译API一样逐行返回"""
+    return {'trans_result': [{'src': line, 'dst': line.upper()} for line in query.split('\n')]}
+
+
+class FakeTransport(HTTPTransport):
+    """
+    用处理函数代替网络请求的传输层，重试、限流和熔断逻辑与真实的传输层相同
+    处理函数接收q参数，返回接口的JSON结果或抛出翻译异常
+    """
+
+    def __init__(self, handler=upper_case_result, **kwargs):
+        kwargs.setdefault('backoff_base', 0.0)
+        super().__init__(**kwargs)
+        self.handler = handler
+        self.queries = []
+
+    def _send(self, url, data):
+        self.queries.append(data['q'])
+        return self.handler(data['q'])
@@ -0,0 +1,66 @@
+"""
+术语表在HTML表格单元格中的保护
+
+用法: python -m pytest tests/test_glossary_tables.py
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from translation.glossary import Glossary
+from translation.markdown_translator import MarkdownTranslator
+from translation_api import TranslationAPI
+
+
+class UpperCaseTranslator(TranslationAPI):
+    """把原文转为大写作为译文，并记录交给翻译的所有片段"""
+
+    def __init__(self):
+        self.sent = []
+
+    def translate(self, text, from_lang, to_lang):
+        return self.batch_translate([text], from_lang, to_lang)[0]
+
+    def batch_translate(self, texts, from_lang, to_lang):
+        self.sent.extend(texts)
+        return [text.upper() for text in texts]
+
+
+TABLE_DOCUMENT = (
+    "The RL score is reported below.\n\n"
+    "<html><body><table><tr><td>Metric</td><td>RL score</td></tr>"
+    "<tr><td>Final RL score of model</td><td>$x_1$ and RL score</td></tr></table></body></html>\n"
+)
+
+
+class GlossaryTableTest(unittest.TestCase):
+
+    def translate(self, glossary):
+        api = UpperCaseTranslator()
+        translator = MarkdownTranslator(api, "en", "zh", skip_untranslatable=False, glossary=glossary)
+        return api, translator.translate_markdown(TABLE_DOCUMENT)
+
+    def test_term_in_cell_is_not_sent(self):
+        api, result = self.translate(Glossary({"RL score": None}))
+        self.assertFalse([text for text in api.sent if "RL score" in text or "RL SCORE" in text])
+        self.assertIn("<td>RL score</td>", result)
+        self.assertIn("<td>FINAL RL score OF MODEL</td>", result)
+        self.assertIn("<td>$x_1$ AND RL score</td>", result)
+        self.assertIn("THE RL score IS REPORTED BELOW.", result)
+        self.assertNotIn("__GLOSSARY_", result)
+
+    def test_fixed_translation_in_cell(self):
+        _, result = self.translate(Glossary({"RL score": "RL得分"}))
+        self.assertIn("<td>RL得分</td>", result)
+        self.assertIn("<td>FINAL RL得分 OF MODEL</td>", result)
+
+    def test_without_glossary_cells_are_translated(self):
+        _, result = self.translate(None)
+        self.assertIn("<td>RL SCORE</td>", result)
+
+
+if __name__ == '__main__':
+    unittest.main()
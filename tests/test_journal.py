@@ -0,0 +1,118 @@
+"""
+翻译断点日志：任务中断后重新运行时从日志恢复，只请求剩余的片段
+
+用法: python -m pytest tests/test_journal.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from fakes import FakeTransport, upper_case_result
+from translation.errors import QuotaExceededError
+from translation.journal import JournaledTranslationAPI, TranslationJournal, iter_checkpoint_batches
+from translation.rate_limiter import AdaptiveRateLimiter
+from translation_api import BaiduTranslationAPI
+
+
+TEXTS = [f"Sentence number {i} of the document." for i in range(12)]
+
+
+class FailAfter:
+    """前limit次请求正常返回，之后抛出额度用尽的错误，模拟任务中途失败"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+
+    def __call__(self, query):
+        self.count += 1
+        if self.count > self.limit:
+            raise QuotaExceededError("额度已用尽")
+        return upper_case_result(query)
+
+
+class JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "paper_translated.journal.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_api(self, handler=upper_case_result, target_lang="zh"):
+        """检查点批次很小，每批对应一次请求，便于控制中断的位置"""
+        transport = FakeTransport(handler)
+        api = BaiduTranslationAPI('app', 'key', transport=transport, rate_limiter=AdaptiveRateLimiter(10000))
+        journal = TranslationJournal(self.path, "en", target_lang)
+        chars = sum(len(text) for text in TEXTS[:3])
+        return JournaledTranslationAPI(api, journal, checkpoint_chars=chars), journal, transport
+
+    def interrupted_run(self):
+        api, journal, _ = self.make_api(FailAfter(2))
+        with self.assertRaises(QuotaExceededError):
+            api.batch_translate(TEXTS, "en", "zh")
+        journal.close()
+        return journal
+
+    def test_checkpoint_batches_keep_order(self):
+        batches = list(iter_checkpoint_batches(["a" * 5, "b" * 5, "c" * 20, "d"], 10))
+        self.assertEqual(batches, [["a" * 5, "b" * 5], ["c" * 20], ["d"]])
+
+    def test_completed_batches_survive_failure(self):
+        journal = self.interrupted_run()
+        self.assertEqual(journal.completed, 6)
+
+    def test_resume_requests_only_remaining_texts(self):
+        self.interrupted_run()
+
+        api, journal, transport = self.make_api()
+        self.assertEqual(journal.resumed, 6)
+        result = api.batch_translate(TEXTS, "en", "zh")
+        self.assertEqual(result, [text.upper() for text in TEXTS])
+        sent = [line for query in transport.queries for line in query.split('\n')]
+        self.assertEqual(sent, TEXTS[6:])
+        self.assertEqual(journal.completed, len(TEXTS))
+
+    def test_take_releases_resumed_entries(self):
+        self.interrupted_run()
+
+        journal = TranslationJournal(self.path, "en", "zh")
+        self.assertEqual(journal.take(TEXTS[0]), TEXTS[0].upper())
+        self.assertIsNone(journal.take(TEXTS[0]))
+        self.assertIsNone(journal.take(TEXTS[-1]))
+
+    def test_truncated_last_line_is_ignored(self):
+        self.interrupted_run()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"s": "Sentence number 6')
+
+        api, journal, transport = self.make_api()
+        self.assertEqual(journal.resumed, 6)
+        self.assertEqual(api.batch_translate(TEXTS, "en", "zh"), [text.upper() for text in TEXTS])
+        journal.close()
+        # 补写的换行使新记录另起一行，再次恢复时所有片段都能读到
+        self.assertEqual(TranslationJournal(self.path, "en", "zh").resumed, len(TEXTS))
+
+    def test_other_language_pair_starts_over(self):
+        self.interrupted_run()
+
+        api, journal, transport = self.make_api(target_lang="jp")
+        self.assertEqual(journal.resumed, 0)
+        api.batch_translate(TEXTS, "en", "jp")
+        sent = [line for query in transport.queries for line in query.split('\n')]
+        self.assertEqual(sent, TEXTS)
+
+    def test_discard_removes_journal(self):
+        api, journal, _ = self.make_api()
+        api.batch_translate(TEXTS, "en", "zh")
+        journal.discard()
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
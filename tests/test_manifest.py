@@ -0,0 +1,98 @@
+"""
+增量翻译清单：重新翻译时复用未修改块的译文，只请求修改过的块
+
+用法: python -m pytest tests/test_manifest.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from fakes import FakeTransport
+from translation.manifest import TranslationManifest
+from translation.markdown_translator import MarkdownTranslator
+from translation.rate_limiter import AdaptiveRateLimiter
+from translation_api import BaiduTranslationAPI
+
+
+DOCUMENT = (
+    "# Introduction\n"
+    "\n"
+    "The first paragraph describes the method.\n"
+    "\n"
+    "The second paragraph reports the results.\n"
+    "\n"
+    "The third paragraph discusses the limitations.\n"
+)
+
+
+class ManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "paper_translated.manifest.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def translate(self, text, **manifest_options):
+        """用新的清单对象翻译一次并保存，返回(译文, 发送给翻译API的片段, 清单)"""
+        transport = FakeTransport()
+        api = BaiduTranslationAPI('app', 'key', transport=transport, rate_limiter=AdaptiveRateLimiter(10000))
+        manifest = TranslationManifest(self.path, "en", "zh", **manifest_options)
+        result = MarkdownTranslator(api, "en", "zh").translate_markdown(text, manifest)
+        manifest.save()
+        sent = [line for query in transport.queries for line in query.split('\n')]
+        return result, sent, manifest
+
+    def test_unchanged_document_makes_no_requests(self):
+        first, sent, _ = self.translate(DOCUMENT)
+        self.assertEqual(len(sent), 4)
+
+        second, sent, manifest = self.translate(DOCUMENT)
+        self.assertEqual(sent, [])
+        self.assertEqual(second, first)
+        self.assertEqual(manifest.stats(), {"reused": 4, "translated": 0})
+
+    def test_only_edited_block_is_translated(self):
+        self.translate(DOCUMENT)
+        edited = DOCUMENT.replace("reports the results", "reports the new results")
+
+        result, sent, manifest = self.translate(edited)
+        self.assertEqual(sent, ["The second paragraph reports the new results."])
+        self.assertIn("THE SECOND PARAGRAPH REPORTS THE NEW RESULTS.", result)
+        self.assertEqual(manifest.stats(), {"reused": 3, "translated": 1})
+
+    def test_removed_blocks_are_dropped(self):
+        self.translate(DOCUMENT)
+        self.translate(DOCUMENT.split("\n\nThe third")[0] + "\n")
+        with open(self.path, 'r', encoding='utf-8') as f:
+            blocks = json.load(f)["blocks"]
+        self.assertEqual(len(blocks), 3)
+
+    def test_changed_settings_invalidate_manifest(self):
+        self.translate(DOCUMENT, fingerprint="glossary-a")
+        _, sent, _ = self.translate(DOCUMENT, fingerprint="glossary-b")
+        self.assertEqual(len(sent), 4)
+
+    def test_partial_file_is_removed(self):
+        _, _, manifest = self.translate(DOCUMENT)
+        self.assertFalse(os.path.exists(manifest._partial_path))
+
+        # 未保存就关闭时，清单文件保持上一次的内容
+        with open(self.path, 'r', encoding='utf-8') as f:
+            saved = f.read()
+        manifest = TranslationManifest(self.path, "en", "zh")
+        manifest.put("A new block.\n", "新的块。\n")
+        manifest.close()
+        self.assertFalse(os.path.exists(manifest._partial_path))
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), saved)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+MarkdownTranslator的解析、分组与重组
+
+用法: python -m pytest tests/test_markdown_translator.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from translation.manifest import TranslationManifest
+from translation.markdown_translator import MarkdownTranslator
+from translation_api import TranslationAPI
+
+
+class RecordingTranslator(TranslationAPI):
+    """按transform生成译文（默认转为大写），并记录每次batch_translate收到的片段"""
+
+    def __init__(self, transform=str.upper):
+        self.transform = transform
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def translate(self, text, from_lang, to_lang):
+        return self.batch_translate([text], from_lang, to_lang)[0]
+
+    def batch_translate(self, texts, from_lang, to_lang):
+        with self._lock:
+            self.calls.append(list(texts))
+        return [self.transform(text) for text in texts]
+
+
+def paragraphs(count):
+    return ''.join(f"Paragraph {i} talks about the topic at some length.\n\n" for i in range(count))
+
+
+class ParallelGroupingTest(unittest.TestCase):
+
+    def translate(self, text, manifest=None):
+        api = RecordingTranslator()
+        translator = MarkdownTranslator(api, "en", "zh", max_workers=4, chunk_chars=600,
+                                        skip_untranslatable=False)
+        return api, translator.translate_markdown(text, manifest)
+
+    def test_chunks_without_manifest(self):
+        api, result = self.translate(paragraphs(200))
+        self.assertGreater(len(api.calls), 1)
+        self.assertIn("PARAGRAPH 199 TALKS", result)
+
+    def test_chunks_with_manifest(self):
+        text = paragraphs(200)
+        plain_api, expected = self.translate(text)
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = TranslationManifest(os.path.join(tmp, "doc.manifest.json"), "en", "zh")
+            api, result = self.translate(text, manifest)
+        self.assertEqual(len(api.calls), len(plain_api.calls))
+        self.assertEqual(result, expected)
+
+
+class ReflowTest(unittest.TestCase):
+
+    def translate(self, text, transform=str.upper):
+        api = RecordingTranslator(transform)
+        translator = MarkdownTranslator(api, "en", "zh", skip_untranslatable=False)
+        result = translator.translate_markdown(text)
+        return [text for call in api.calls for text in call], result
+
+    def test_soft_wrapped_lines_are_joined(self):
+        # 行尾的两个空格不算硬换行
+        sent, _ = self.translate("The first line of the paragraph  \nand the second line.\n")
+        self.assertEqual(sent, ["The first line of the paragraph and the second line."])
+
+    def test_hard_breaks_are_kept(self):
+        sent, result = self.translate("First line<br>\nSecond line\\\nThird line\n")
+        self.assertEqual(len(sent), 3)
+        self.assertEqual(result.count('\n'), 3)
+
+    def test_hyphenated_words_are_joined(self):
+        sent, _ = self.translate("This is an exam-\nple of hyphenation.\n")
+        self.assertEqual(sent, ["This is an example of hyphenation."])
+
+    def test_untranslated_paragraph_keeps_original_lines(self):
+        text = "A paragraph wrapped at\nan unusual width, with a well-\nknown hyphen.\n"
+        _, result = self.translate(text, transform=lambda text: text)
+        self.assertEqual(result, text)
+
+    def test_translation_is_rewrapped_to_source_width(self):
+        text = ("The quick brown fox jumps over\nthe lazy dog and keeps running\n"
+                "until it reaches the river bank.\n")
+        _, result = self.translate(text)
+        lines = result.rstrip('\n').split('\n')
+        self.assertGreater(len(lines), 1)
+        self.assertLessEqual(max(len(line) for line in lines), max(len(line) for line in text.split('\n')))
+        self.assertEqual(' '.join(lines), text.upper().replace('\n', ' ').strip())
+
+    def test_cjk_translation_stays_on_one_line(self):
+        text = "The quick brown fox jumps over\nthe lazy dog.\n"
+        _, result = self.translate(text, transform=lambda text: "敏捷的棕色狐狸跳过了懒狗。")
+        self.assertEqual(result, "敏捷的棕色狐狸跳过了懒狗。\n")
+
+    def test_list_item_continuation_keeps_indent(self):
+        text = "- A list item that is wrapped\n  onto a second indented line.\n"
+        sent, result = self.translate(text)
+        self.assertEqual(len(sent), 1)
+        self.assertIn("A LIST ITEM", result)
+        self.assertTrue(result.split('\n')[1].startswith("  "))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+百度翻译API的批量打包、超长片段拆分与结果对齐
+
+用法: python -m pytest tests/test_translation_api.py
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from fakes import FakeTransport, upper_case_result
+from translation.rate_limiter import AdaptiveRateLimiter
+from translation_api import BAIDU_MAX_QUERY_BYTES, BaiduTranslationAPI, pack_segments, split_segment
+
+
+def make_api(handler=upper_case_result):
+    transport = FakeTransport(handler)
+    return BaiduTranslationAPI('app', 'key', transport=transport, rate_limiter=AdaptiveRateLimiter(10000)), transport
+
+
+def query_bytes(query):
+    return len(query.encode('utf-8'))
+
+
+class PackSegmentsTest(unittest.TestCase):
+
+    def test_batches_stay_under_limit_in_order(self):
+        texts = [f"segment {i} " * 30 for i in range(100)]
+        chunks = pack_segments(texts, 2000)
+        self.assertEqual([i for chunk in chunks for i in chunk], list(range(100)))
+        for chunk in chunks:
+            self.assertLessEqual(query_bytes('\n'.join(texts[i] for i in chunk)), 2000)
+        self.assertGreater(len(chunks), 1)
+
+    def test_segment_at_limit_is_its_own_batch(self):
+        texts = ['a', 'b' * BAIDU_MAX_QUERY_BYTES, 'c']
+        self.assertEqual(pack_segments(texts), [[0], [1], [2]])
+
+
+class SplitSegmentTest(unittest.TestCase):
+
+    def assert_split(self, text, max_bytes=BAIDU_MAX_QUERY_BYTES):
+        pieces = split_segment(text, max_bytes)
+        self.assertEqual(''.join(pieces), text)
+        for piece in pieces:
+            self.assertLessEqual(query_bytes(piece), max_bytes)
+        return pieces
+
+    def test_short_segment_is_unchanged(self):
+        self.assertEqual(split_segment("One sentence."), ["One sentence."])
+
+    def test_splits_at_sentence_boundaries(self):
+        text = ' '.join(f"Sentence number {i} is here." for i in range(400))
+        pieces = self.assert_split(text)
+        self.assertGreater(len(pieces), 1)
+        for piece in pieces[:-1]:
+            self.assertTrue(piece.rstrip().endswith('.'))
+
+    def test_falls_back_to_whitespace_then_characters(self):
+        words = self.assert_split(' '.join(['word'] * 3000))
+        self.assertTrue(all(piece.endswith(' ') for piece in words[:-1]))
+        self.assert_split('x' * 13000)
+
+    def test_multibyte_text_is_cut_on_character_boundaries(self):
+        pieces = self.assert_split('中' * 3000)
+        self.assertEqual(len(pieces), 2)
+
+
+class BatchTranslateTest(unittest.TestCase):
+
+    def test_segments_are_packed_into_few_requests(self):
+        api, transport = make_api()
+        texts = [f"  text {i}  " for i in range(50)]
+        self.assertEqual(api.batch_translate(texts), [f"  TEXT {i}  " for i in range(50)])
+        self.assertEqual(len(transport.queries), 1)
+
+    def test_oversized_segment_is_split_and_rejoined(self):
+        api, transport = make_api()
+        big = ' '.join(f"Sentence number {i} is here." for i in range(400))
+        result = api.batch_translate(['short one', big, 'tail'])
+        self.assertEqual(result, ['SHORT ONE', big.upper(), 'TAIL'])
+        self.assertGreater(len(transport.queries), 1)
+        for query in transport.queries:
+            self.assertLessEqual(query_bytes(query), BAIDU_MAX_QUERY_BYTES)
+
+    def test_oversized_text_in_translate(self):
+        api, transport = make_api()
+        big = 'word ' * 2000
+        self.assertEqual(api.translate(big), big.upper())
+        for query in transport.queries:
+            self.assertLessEqual(query_bytes(query), BAIDU_MAX_QUERY_BYTES)
+
+    def test_misaligned_batch_falls_back_to_single_segments(self):
+        def merge_lines(query):
+            # 服务把多行请求合并成一段返回，结果无法与片段对齐
+            if '\n' in query:
+                return {'trans_result': [{'src': query.replace('\n', ' '), 'dst': 'MERGED'}]}
+            return upper_case_result(query)
+
+        api, transport = make_api(merge_lines)
+        self.assertEqual(api.batch_translate(['one', 'two', 'three']), ['ONE', 'TWO', 'THREE'])
+        self.assertEqual(transport.queries, ['one\ntwo\nthree', 'one', 'two', 'three'])
+
+
+if __name__ == '__main__':
+    unittest.main()
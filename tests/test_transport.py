@@ -0,0 +1,118 @@
+"""
+传输层的重试与熔断：打开 -> 半开 -> 关闭的完整过程，以及半开试探请求的各种结果
+
+用法: python -m pytest tests/test_transport.py
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from fakes import FakeTransport, upper_case_result
+from translation.errors import CircuitOpenError, RateLimitError, TransientTranslationError
+from translation.transport import CircuitBreaker
+
+
+RECOVERY = 0.05
+
+
+class Script:
+    """按顺序返回预设结果的处理函数，元素为异常时抛出，用完后正常返回"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def __call__(self, query):
+        if self.outcomes:
+            outcome = self.outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+        return upper_case_result(query)
+
+
+def make_transport(*outcomes, max_retries=0):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=RECOVERY)
+    return FakeTransport(Script(*outcomes), circuit_breaker=breaker, max_retries=max_retries), breaker
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_open_half_open_closed(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=RECOVERY)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        time.sleep(RECOVERY * 1.5)
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+        # 试探请求结束前，其余请求继续被拒绝
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=RECOVERY)
+        breaker.record_failure()
+        breaker.record_failure()
+        time.sleep(RECOVERY * 1.5)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+
+class TransportTest(unittest.TestCase):
+
+    def open_breaker(self, transport):
+        for _ in range(2):
+            with self.assertRaises(TransientTranslationError):
+                transport.post_json('https://example.test', {'q': 'x'})
+
+    def test_transient_errors_are_retried(self):
+        # 未达到熔断阈值的失败会被重试，成功后失败计数清零
+        transport, breaker = make_transport(TransientTranslationError("timeout"), max_retries=3)
+        self.assertEqual(transport.post_json('https://example.test', {'q': 'a'})['trans_result'][0]['dst'], 'A')
+        self.assertEqual(len(transport.queries), 2)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_open_circuit_fails_fast_then_recovers(self):
+        transport, breaker = make_transport(TransientTranslationError("down"), TransientTranslationError("down"))
+        self.open_breaker(transport)
+        with self.assertRaises(CircuitOpenError):
+            transport.post_json('https://example.test', {'q': 'x'})
+        self.assertEqual(len(transport.queries), 2)
+
+        time.sleep(RECOVERY * 1.5)
+        transport.post_json('https://example.test', {'q': 'x'})
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_throttled_probe_closes_the_circuit(self):
+        transport, breaker = make_transport(TransientTranslationError("down"), TransientTranslationError("down"),
+                                            RateLimitError("429"))
+        self.open_breaker(transport)
+        time.sleep(RECOVERY * 1.5)
+        transport.post_json('https://example.test', {'q': 'x'})
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(len(transport.queries), 4)
+
+    def test_unexpected_error_in_probe_reopens(self):
+        transport, breaker = make_transport(TransientTranslationError("down"), TransientTranslationError("down"))
+        self.open_breaker(transport)
+        time.sleep(RECOVERY * 1.5)
+
+        def broken_check(result):
+            raise KeyError('trans_result')
+
+        with self.assertRaises(KeyError):
+            transport.post_json('https://example.test', {'q': 'x'}, check=broken_check)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+
+if __name__ == '__main__':
+    unittest.main()